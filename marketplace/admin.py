@@ -1,6 +1,8 @@
 from django.contrib import admin
-from .models import Account, Subject, UserProfile, Note, Order, Review, Wishlist
+from .models import Account, Subject, UserProfile, Note, Order, Review, Wishlist, SellerStats, Leaderboard, RelatedNotes, Tag, RequestProfile
 from django.contrib.auth.admin import UserAdmin
+from django.utils.html import format_html, format_html_join
+from . import caching, search
 
 @admin.register(Account)
 class AccountAdmin(UserAdmin):
@@ -33,6 +35,12 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ['year', 'department']
     ordering = ['user__phone']
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
+    ordering = ['name']
+
 @admin.register(Note)
 class NoteAdmin(admin.ModelAdmin):
     list_display = ['title', 'seller', 'subject', 'price', 'is_free', 'is_approved', 'views', 'downloads']
@@ -43,6 +51,9 @@ class NoteAdmin(admin.ModelAdmin):
     
     def approve_notes(self, request, queryset):
         queryset.update(is_approved=True)
+        # update() bypasses post_save, so refresh the search index and response cache explicitly
+        search.reindex_notes(queryset)
+        caching.bump_catalog_version()
     approve_notes.short_description = "Approve selected notes"
     
     actions = [approve_notes]
@@ -67,3 +78,51 @@ class WishlistAdmin(admin.ModelAdmin):
     list_display = ['user', 'note', 'created_at']
     search_fields = ['user__phone', 'note__title']
     ordering = ['-created_at']
+
+@admin.register(SellerStats)
+class SellerStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_notes', 'total_views', 'total_sales', 'rating_count', 'updated_at']
+    search_fields = ['user__phone']
+    readonly_fields = [field.name for field in SellerStats._meta.fields]
+    ordering = ['-total_sales']
+
+@admin.register(Leaderboard)
+class LeaderboardAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'scope', 'computed_at']
+    list_filter = ['kind']
+    readonly_fields = ['kind', 'scope', 'note_ids', 'computed_at']
+    ordering = ['kind', 'scope']
+
+@admin.register(RelatedNotes)
+class RelatedNotesAdmin(admin.ModelAdmin):
+    list_display = ['note', 'computed_at']
+    search_fields = ['note__title']
+    readonly_fields = ['note', 'neighbors', 'computed_at']
+    ordering = ['-computed_at']
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'query_ms', 'user']
+    list_filter = ['view_name', 'status_code', 'trigger']
+    search_fields = ['path', 'view_name', 'user__phone']
+    exclude = ['profile', 'queries']
+    readonly_fields = [
+        'created_at', 'user', 'trigger', 'method', 'path', 'view_name', 'status_code',
+        'duration_ms', 'query_count', 'query_ms', 'sql_timeline', 'profile_output',
+    ]
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def profile_output(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto">{}</pre>', obj.profile)
+    profile_output.short_description = "cProfile (cumulative)"
+    
+    def sql_timeline(self, obj):
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td><td><code>{}</code></td></tr>',
+            ((query['start_ms'], query['duration_ms'], query['sql']) for query in obj.queries)
+        )
+        return format_html('<table><tr><th>Start (ms)</th><th>Duration (ms)</th><th>SQL</th></tr>{}</table>', rows)
+    sql_timeline.short_description = "SQL timeline"
@@ -0,0 +1,333 @@
+"""
+Async versions of the read-heavy API views, served under ASGI.
+
+With ASYNC_VIEWS on (the default when started through noteshub/asgi.py),
+urls.py routes note_list, search_notes, subject_list and the dashboard
+endpoints here. Each view returns the same JSON as its sync counterpart in
+views.py. Independent queries (page and count, facets, the two activity
+feeds) run concurrently through run_concurrently(), each on its own worker
+thread and database connection, so a request waits for the slowest query
+instead of their sum and the event loop keeps serving other requests.
+
+DRF 3.14 function views are sync only, so async_api_view does the parts of
+@api_view these read-only endpoints need: method check, authentication with
+the configured classes, permission checks and JSON rendering.
+"""
+import asyncio
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework import exceptions, status
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from . import (
+    caching, conditional, dashboard, facets, fieldsets, filters, pagination, projection, seller_stats, streaming,
+    wishlists,
+)
+from .models import Note, SellerStats, Subject
+from .serializers import NoteSerializer, SubjectSerializer
+
+PAGE_SIZE = 12
+
+
+def _closing(call):
+    def run():
+        try:
+            return call()
+        finally:
+            # Worker threads outlive the request; release their connection per CONN_MAX_AGE
+            close_old_connections()
+    return run
+
+
+async def run_concurrently(*calls):
+    """
+    Run independent blocking calls (ORM, cache) at the same time, each on its own thread
+    """
+    return await asyncio.gather(*(sync_to_async(_closing(call), thread_sensitive=False)() for call in calls))
+
+
+def _initialize(request, permissions):
+    """
+    Wrap the request for DRF, authenticate it and check permissions (raises APIException)
+    """
+    request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    request.user  # Authenticates now, off the event loop
+    for permission_class in permissions:
+        if not permission_class().has_permission(request, None):
+            if request.successful_authenticator is None:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied()
+    return request
+
+
+def render(response):
+    if not isinstance(response, Response):
+        return response  # Already final, e.g. a streamed response
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = 'application/json'
+    response.renderer_context = {}
+    return response.render()
+
+
+def error_response(request, exc):
+    # Same rules as APIView.handle_exception: 401 with a challenge if the
+    # first authenticator has one, otherwise 403
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticators = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        header = authenticators[0]().authenticate_header(request) if authenticators else None
+        if header:
+            exc.auth_header = header
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    return render(exception_handler(exc, {}))
+
+
+def async_api_view(http_method_names):
+    """
+    Async counterpart of @api_view for read-only views; use with @permission_classes
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return error_response(request, exceptions.MethodNotAllowed(request.method))
+            permissions = getattr(wrapper, 'permission_classes', api_settings.DEFAULT_PERMISSION_CLASSES)
+            try:
+                request = await sync_to_async(_initialize)(request, permissions)
+            except exceptions.APIException as e:
+                return error_response(request, e)
+            return render(await view(request, *args, **kwargs))
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+@async_api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional.conditional_response('subject_list')
+@caching.cache_anonymous_response('subject_list')
+async def subject_list(request):
+    """
+    Get list of all subjects
+    """
+    subjects = [subject async for subject in Subject.objects.all()]
+    serializer = SubjectSerializer(subjects, many=True)
+    return Response(serializer.data)
+
+
+async def _filtered_notes(request, fields):
+    # Search ranking queries the index, so filtering itself runs off the event loop.
+    # Cursor pages are ordered by date and skip ranking.
+    notes = Note.objects.filter(is_approved=True)
+    notes = await sync_to_async(filters.filter_notes)(
+        notes, request.GET, ranked=not pagination.wants_cursor(request)
+    )
+    return fieldsets.prune(notes.select_related('seller', 'subject'), fields)
+
+
+def _fields_error(e):
+    return Response({
+        'error': str(e)
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def _cursor_response(request, notes, namespace, serialize):
+    calls = [
+        partial(pagination.cached_count, notes.order_by(), namespace, pagination.filter_params(request)),
+        partial(pagination.cursor_page, notes, request),
+        partial(wishlists.for_request, request),
+    ]
+    if request.GET.get('facets'):
+        calls.append(partial(facets.get_facets, request))
+    try:
+        total, (notes_page, page_info), wishlist_ids, *facet_counts = await run_concurrently(*calls)
+    except pagination.InvalidCursor as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    data = {'results': serialize(notes_page, wishlist_ids), 'count': total, **page_info}
+    if facet_counts:
+        data['facets'] = facet_counts[0]
+    return Response(data)
+
+
+@async_api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional.conditional_response('note_list', per_user=True)
+@caching.cache_anonymous_response('note_list')
+async def note_list(request):
+    """
+    Get list of all notes with advanced filtering and search
+    """
+    try:
+        fields = fieldsets.parse(request.GET)
+    except ValueError as e:
+        return _fields_error(e)
+    notes = projection.note_values(await _filtered_notes(request, None), fields)
+
+    # Cursor pagination
+    if pagination.wants_cursor(request):
+        return await _cursor_response(
+            request, notes, 'note_list',
+            lambda page, wishlist_ids: projection.serialize_notes(page, fields, wishlist_ids)
+        )
+
+    # Pagination: count, page and facets are independent
+    page = int(request.GET.get('page', 1))
+    start = (page - 1) * PAGE_SIZE
+    end = start + PAGE_SIZE
+
+    calls = [
+        partial(pagination.cached_count, notes.order_by(), 'note_list', pagination.filter_params(request)),
+        partial(list, notes[start:end]),
+        partial(wishlists.for_request, request),
+    ]
+    if request.GET.get('facets'):
+        calls.append(partial(facets.get_facets, request))
+    total_count, notes_page, wishlist_ids, *facet_counts = await run_concurrently(*calls)
+
+    data = {
+        'results': projection.serialize_notes(notes_page, fields, wishlist_ids),
+        'count': total_count,
+        'next': f'/api/notes/?page={page + 1}' if end < total_count else None,
+        'previous': f'/api/notes/?page={page - 1}' if page > 1 else None,
+        'current_page': page,
+        'total_pages': (total_count + PAGE_SIZE - 1) // PAGE_SIZE
+    }
+    if facet_counts:
+        data['facets'] = facet_counts[0]
+    return Response(data)
+
+
+@async_api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional.conditional_response('search_notes', per_user=True)
+@caching.cache_anonymous_response('search_notes')
+async def search_notes(request):
+    """
+    Advanced search functionality
+    """
+    try:
+        fields = fieldsets.parse(request.GET)
+    except ValueError as e:
+        return _fields_error(e)
+    notes = await _filtered_notes(request, fields)
+
+    # Cursor pagination (the plain list response is kept for existing clients)
+    if pagination.wants_cursor(request):
+        return await _cursor_response(
+            request, notes, 'search_notes',
+            lambda page, wishlist_ids: NoteSerializer(
+                page, many=True, fields=fields, context={'wishlist_ids': wishlist_ids}
+            ).data
+        )
+
+    wishlist_ids = await sync_to_async(wishlists.for_request)(request)
+    context = {'wishlist_ids': wishlist_ids}
+
+    # Streamed output for wide searches and exports
+    if streaming.wants_stream(request):
+        return streaming.async_stream_json_list(notes, partial(NoteSerializer, fields=fields), context=context)
+
+    serializer = NoteSerializer([note async for note in notes], many=True, fields=fields, context=context)
+    return Response(serializer.data)
+
+
+async def _stats_for(user):
+    stats = await SellerStats.objects.filter(pk=user.pk).afirst()
+    if stats is None:
+        stats = await sync_to_async(seller_stats.rebuild_for)(user.pk)
+    return stats
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def dashboard_stats(request):
+    """
+    Get dashboard statistics for the user
+    """
+    stats = await _stats_for(request.user)
+
+    return Response(dashboard.stats_data(stats))
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def dashboard_activity(request):
+    """
+    Get recent activity for the user
+    """
+    user = request.user
+    recent_notes, recent_wishlist = await run_concurrently(
+        partial(list, dashboard.recent_notes(user)),
+        partial(list, dashboard.recent_wishlist(user)),
+    )
+
+    return Response(dashboard.activity_data(recent_notes, recent_wishlist))
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def dashboard_top_notes(request):
+    """
+    Get top rated notes for the dashboard
+    """
+    return Response(await sync_to_async(dashboard.top_notes)())
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def dashboard_overview(request):
+    """
+    Get several dashboard sections in one response (?sections=stats,activity,top_notes,analytics)
+    """
+    try:
+        sections = dashboard.parse_sections(request.GET.get('sections', ''))
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Every query the sections need, run at once
+    user = request.user
+    calls = {}
+    if 'stats' in sections or 'analytics' in sections:
+        calls['stats'] = partial(seller_stats.get_for_user, user)
+    if 'activity' in sections:
+        calls['recent_notes'] = partial(list, dashboard.recent_notes(user))
+        calls['recent_wishlist'] = partial(list, dashboard.recent_wishlist(user))
+    if 'top_notes' in sections:
+        calls['top_notes'] = dashboard.top_notes
+    results = dict(zip(calls, await run_concurrently(*calls.values())))
+
+    data = {}
+    for section in sections:
+        if section == 'stats':
+            data['stats'] = dashboard.stats_data(results['stats'])
+        elif section == 'activity':
+            data['activity'] = dashboard.activity_data(results['recent_notes'], results['recent_wishlist'])
+        elif section == 'top_notes':
+            data['top_notes'] = results['top_notes']
+        elif section == 'analytics':
+            data['analytics'] = await sync_to_async(dashboard.analytics_data)(results['stats'])
+    return Response(data)
+
+
+@async_api_view(['GET'])
+@permission_classes([IsAuthenticated])
+async def analytics(request):
+    """
+    Get analytics data for the user
+    """
+    stats = await _stats_for(request.user)
+
+    return Response(await sync_to_async(dashboard.analytics_data)(stats))
@@ -0,0 +1,144 @@
+"""
+JWT authentication that resolves the request user without a database query.
+
+JWTAuthentication loads the Account row on every request. CachedJWTAuthentication
+keeps what authentication and permission checks read (id, is_active,
+is_staff, is_superuser and a digest of the password hash for the revocation
+check) in a small per-process LRU with a short TTL, optionally backed by the
+shared Django cache, and builds a user with only those fields loaded; any
+other field is read from the database on first access. The password hash
+itself is never cached, so steady-state authenticated requests don't query
+the database for auth. Account saves and deletes evict the entry (see signals.py), so
+deactivation and password changes apply immediately in this process and
+within AUTH_USER_CACHE_TTL seconds in other workers. Writes that bypass
+signals (queryset.update()) are also only picked up after the TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Account
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_SIZE = 10000
+SHARED_KEY = 'auth_user:{user_id}'
+
+# Loaded columns, in model order for Model.from_db(). The rest are deferred, so
+# saving the rebuilt user only writes these and the fields a view assigns.
+CACHED_FIELDS = {Account._meta.pk.attname, 'is_active', 'is_staff', 'is_superuser'}
+FIELD_NAMES = [field.attname for field in Account._meta.concrete_fields if field.attname in CACHED_FIELDS]
+
+
+class UserCache:
+    def __init__(self):
+        self._entries = OrderedDict()  # str(user id) -> (expires at, (column values, password digest))
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TTL', DEFAULT_TTL)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'AUTH_USER_CACHE_SIZE', DEFAULT_MAX_SIZE)
+
+    @property
+    def shared(self):
+        return getattr(settings, 'AUTH_USER_CACHE_SHARED', False)
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if self.shared:
+            values = cache.get(SHARED_KEY.format(user_id=key))
+            if values is not None:
+                self._store(key, values)
+                return values
+        return None
+
+    def set(self, user_id, values):
+        key = str(user_id)
+        self._store(key, values)
+        if self.shared:
+            cache.set(SHARED_KEY.format(user_id=key), values, self.ttl)
+
+    def _store(self, key, values):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared:
+            cache.delete(SHARED_KEY.format(user_id=key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def load_user(user_id):
+    """
+    Return (Account, password digest) for a token's user id from the cache, or None if it doesn't exist
+    """
+    entry = user_cache.get(user_id)
+    if entry is None:
+        row = (
+            Account.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list(*FIELD_NAMES, 'password').first()
+        )
+        if row is None:
+            return None
+        entry = (row[:-1], get_md5_hash_password(row[-1]))
+        user_cache.set(user_id, entry)
+    values, password_digest = entry
+    # A fresh instance per request, so per-request state (cached relations) isn't shared
+    return Account.from_db(DEFAULT_DB_ALIAS, FIELD_NAMES, values), password_digest
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        """
+        Same checks as JWTAuthentication.get_user, with the account read through user_cache
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        loaded = load_user(user_id)
+        if loaded is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user, password_digest = loaded
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
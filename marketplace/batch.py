@@ -0,0 +1,201 @@
+"""
+In-process dispatch of batched API sub-requests (/api/batch/).
+
+Each sub-request is resolved against the URLconf and handed straight to its
+view as a fresh request carrying the batch's already-authenticated user
+(DRF's forced authentication), so tokens are decoded once per batch and no
+extra HTTP round trips happen. Sub-requests run in order; with ``parallel``
+each run of consecutive GETs is executed concurrently on worker threads.
+"""
+import asyncio
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = 20
+MAX_WORKERS = 4
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+PATH_PREFIX = '/api/'
+BATCH_PATH = '/api/batch/'
+API_MODULE = 'marketplace.'
+
+# Sub-request headers are derived from the batch request except these
+SKIPPED_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_AUTHORIZATION', 'HTTP_COOKIE', 'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE', 'PATH_INFO', 'QUERY_STRING', 'REQUEST_METHOD', 'SCRIPT_NAME',
+}
+# Response headers passed back to the client
+RETURNED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location', 'X-Cache')
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse(payload):
+    """
+    Validate a batch payload. Returns (list of sub-request dicts, parallel flag).
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('requests'), list):
+        raise BatchError('Expected a JSON object with a "requests" list')
+    requests = payload['requests']
+    if not requests:
+        raise BatchError('"requests" must not be empty')
+    if len(requests) > MAX_REQUESTS:
+        raise BatchError(f'At most {MAX_REQUESTS} requests per batch')
+
+    cleaned = []
+    for index, item in enumerate(requests):
+        if not isinstance(item, dict):
+            raise BatchError(f'Request {index} must be an object')
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        if method not in METHODS:
+            raise BatchError(f'Request {index}: method must be one of {", ".join(METHODS)}')
+        if not isinstance(path, str) or not path.startswith(PATH_PREFIX):
+            raise BatchError(f'Request {index}: path must start with {PATH_PREFIX}')
+        if urlsplit(path).path.rstrip('/') == BATCH_PATH.rstrip('/'):
+            raise BatchError(f'Request {index}: batches cannot be nested')
+        cleaned.append({
+            'id': item.get('id', index),
+            'method': method,
+            'path': path,
+            'body': item.get('body'),
+        })
+    return cleaned, bool(payload.get('parallel'))
+
+
+def build_request(request, item):
+    """
+    A WSGIRequest for one sub-request, authenticated as the batch request's user
+    """
+    url = urlsplit(item['path'])
+    body = b'' if item['body'] is None else json.dumps(item['body']).encode()
+    environ = {key: value for key, value in request.META.items() if key not in SKIPPED_META}
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub_request = WSGIRequest(environ)
+    sub_request._force_auth_user = request.user if request.user.is_authenticated else None
+    sub_request._force_auth_token = request.auth
+    sub_request.user = request.user
+    return sub_request
+
+
+async def _collect(parts):
+    return b''.join([part async for part in parts])
+
+
+def _content(response):
+    if not response.streaming:
+        return response.content
+    try:
+        # Async views stream from an async iterator (e.g. search with ?stream=1)
+        if response.is_async:
+            return async_to_sync(_collect)(response.streaming_content)
+        return b''.join(response.streaming_content)
+    finally:
+        response.close()
+
+
+def _body(response):
+    if isinstance(response, Response):
+        return response.data
+    content = _content(response)
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def dispatch(request, item):
+    """
+    Run one sub-request through its view. Returns the result entry.
+    """
+    try:
+        match = resolve(urlsplit(item['path']).path)
+    except Resolver404:
+        match = None
+    # Unknown /api/ paths fall through to the frontend's catch-all route
+    if match is None or not match.func.__module__.startswith(API_MODULE):
+        return {'id': item['id'], 'status': 404, 'headers': {}, 'body': {'error': 'Not found'}}
+
+    sub_request = build_request(request, item)
+    sub_request.resolver_match = match
+    view = match.func
+    if asyncio.iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        response = view(sub_request, *match.args, **match.kwargs)
+        if isinstance(response, Response) and not response.is_rendered:
+            # Render for headers such as Content-Type; the body is taken from response.data
+            response.render()
+        body = _body(response)
+    except Exception:
+        # One failing sub-request shouldn't fail the others
+        logger.exception('Batch sub-request %s %s failed', item['method'], item['path'])
+        return {'id': item['id'], 'status': 500, 'headers': {}, 'body': {'error': 'Internal server error'}}
+
+    return {
+        'id': item['id'],
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RETURNED_HEADERS if response.has_header(name)},
+        'body': body,
+    }
+
+
+def _dispatch_in_thread(request, item):
+    try:
+        return dispatch(request, item)
+    finally:
+        close_old_connections()
+
+
+def run(request, items, parallel=False):
+    """
+    Dispatch sub-requests in order, running consecutive GETs concurrently when ``parallel``
+    """
+    results = []
+    group = []
+
+    def flush_group():
+        if len(group) == 1:
+            results.append(dispatch(request, group[0]))
+        elif group:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(group))) as pool:
+                # Each item runs in a copy of the current context, so request-scoped
+                # state such as sqltrace observers follows it onto the pool thread
+                futures = [
+                    pool.submit(contextvars.copy_context().run, _dispatch_in_thread, request, item)
+                    for item in group
+                ]
+                results.extend(future.result() for future in futures)
+        group.clear()
+
+    for item in items:
+        if parallel and item['method'] == 'GET':
+            group.append(item)
+            continue
+        flush_group()
+        results.append(dispatch(request, item))
+    flush_group()
+    return results
@@ -0,0 +1,204 @@
+"""
+Endpoint benchmarks with regression checks against a stored baseline.
+
+Each scenario is one API request replayed through the Django test client:
+sequential requests give latency percentiles, a pool of concurrent clients
+gives throughput, and CaptureQueriesContext counts SQL queries on a cold
+(cache cleared) and a warm request. Results are plain JSON so a run can be
+saved as the baseline and later runs compared against it with compare().
+See the ``benchmark`` management command.
+"""
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+DEFAULT_LATENCY_THRESHOLD = 0.3  # Allowed relative slowdown of p50/p95 and throughput
+DEFAULT_QUERY_THRESHOLD = 0  # Allowed extra queries per request
+
+
+class Scenario:
+    def __init__(self, name, path, method='get', data=None, auth=False):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.auth = auth
+
+    def request(self, client, context):
+        data = self.data(context) if callable(self.data) else self.data
+        kwargs = {'HTTP_AUTHORIZATION': f"Bearer {context['token']}"} if self.auth else {}
+        if self.method == 'post':
+            return client.post(self.path, data, content_type='application/json', **kwargs)
+        return client.get(self.path, data, **kwargs)
+
+
+SCENARIOS = [
+    Scenario('note_list', '/api/notes/'),
+    Scenario('note_list_page_5', '/api/notes/', data={'page': 5}),
+    Scenario('note_list_filtered', '/api/notes/', data={'semester': 3, 'price_range': '0-100'}),
+    Scenario('note_list_cursor', '/api/notes/', data={'pagination': 'cursor'}),
+    Scenario('note_list_authenticated', '/api/notes/', auth=True),
+    Scenario('search_notes', '/api/search/', data={'q': 'data structures'}),
+    Scenario('search_notes_prefix', '/api/search/', data={'q': 'algo'}),
+    Scenario('wishlist_list', '/api/wishlist/', auth=True),
+    Scenario('dashboard_stats', '/api/dashboard/stats/', auth=True),
+    Scenario('dashboard_activity', '/api/dashboard/activity/', auth=True),
+    Scenario('dashboard_top_notes', '/api/dashboard/top-notes/', auth=True),
+    Scenario('analytics', '/api/analytics/', auth=True),
+    Scenario(
+        'login', '/api/login/', method='post',
+        data=lambda context: {'phone': context['phone'], 'password': context['password']},
+    ),
+]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an ascending list
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def login(phone, password):
+    response = Client().post(
+        '/api/login/', {'phone': phone, 'password': password}, content_type='application/json'
+    )
+    if response.status_code != 200:
+        raise ValueError(f'Login as {phone} failed with status {response.status_code}')
+    return response.json()['tokens']['access']
+
+
+def _count_queries(scenario, client, context):
+    with CaptureQueriesContext(connection) as queries:
+        response = scenario.request(client, context)
+    return len(queries), response
+
+
+def _measure_latency(scenario, context, requests, warmup):
+    client = Client()
+    for _ in range(warmup):
+        scenario.request(client, context)
+    timings = []
+    statuses = {}
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = scenario.request(client, context)
+        timings.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    timings.sort()
+    return timings, statuses
+
+
+def _measure_throughput(scenario, context, concurrency, duration):
+    deadline = time.perf_counter() + duration
+    completed = []
+    lock = threading.Lock()
+
+    def worker():
+        client = Client()
+        count = 0
+        try:
+            while time.perf_counter() < deadline:
+                scenario.request(client, context)
+                count += 1
+        finally:
+            connections.close_all()
+        with lock:
+            completed.append(count)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return sum(completed) / (time.perf_counter() - started)
+
+
+def run_scenario(scenario, context, requests=50, warmup=5, concurrency=4, duration=3.0):
+    client = Client()
+    cache.clear()
+    cold_queries, response = _count_queries(scenario, client, context)
+    warm_queries, response = _count_queries(scenario, client, context)
+
+    timings, statuses = _measure_latency(scenario, context, requests, warmup)
+    throughput = _measure_throughput(scenario, context, concurrency, duration) if concurrency else None
+
+    return {
+        'path': scenario.path,
+        'method': scenario.method.upper(),
+        'status': response.status_code,
+        'statuses': {str(code): count for code, count in statuses.items()},
+        'queries_cold': cold_queries,
+        'queries_warm': warm_queries,
+        'requests': requests,
+        'mean_ms': round(sum(timings) / len(timings), 3) if timings else 0.0,
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'max_ms': round(timings[-1], 3) if timings else 0.0,
+        'concurrency': concurrency,
+        'throughput_rps': round(throughput, 2) if throughput is not None else None,
+    }
+
+
+def run(context, names=None, log=None, **options):
+    """
+    Run the selected scenarios (all by default). Returns the results document.
+    """
+    selected = [scenario for scenario in SCENARIOS if not names or scenario.name in names]
+    results = {}
+    for scenario in selected:
+        results[scenario.name] = run_scenario(scenario, context, **options)
+        if log:
+            log(scenario.name, results[scenario.name])
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'options': options,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline, latency_threshold=DEFAULT_LATENCY_THRESHOLD, query_threshold=DEFAULT_QUERY_THRESHOLD):
+    """
+    List regressions of ``results`` against ``baseline``; empty when within thresholds
+    """
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+
+        for field in ('queries_cold', 'queries_warm'):
+            if current[field] > previous[field] + query_threshold:
+                regressions.append(f'{name}: {field} {previous[field]} -> {current[field]}')
+
+        for field in ('p50_ms', 'p95_ms'):
+            limit = previous[field] * (1 + latency_threshold)
+            if previous[field] and current[field] > limit:
+                regressions.append(f'{name}: {field} {previous[field]} -> {current[field]} (limit {limit:.3f})')
+
+        if current['throughput_rps'] and previous.get('throughput_rps'):
+            limit = previous['throughput_rps'] * (1 - latency_threshold)
+            if current['throughput_rps'] < limit:
+                regressions.append(
+                    f"{name}: throughput_rps {previous['throughput_rps']} -> {current['throughput_rps']} (limit {limit:.2f})"
+                )
+
+        if current['status'] != previous['status']:
+            regressions.append(f"{name}: status {previous['status']} -> {current['status']}")
+    return regressions
@@ -0,0 +1,208 @@
+"""
+Response caching for anonymous catalog GETs.
+
+Cached responses are keyed on the view, the normalized query string and a
+catalog version number. Note/Subject/Review writes bump the version, which
+orphans every cached page at once without having to enumerate keys; the
+orphans simply expire.
+
+Each version counter is paired with the time it last changed, which
+conditional.py turns into ETag and Last-Modified validators. Per-user
+counters do the same for data that belongs to one account (the wishlist).
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_MODIFIED_KEY = 'catalog:modified'
+USER_VERSION_KEY = 'user:{user_id}:version'
+USER_MODIFIED_KEY = 'user:{user_id}:modified'
+STATS_KEY = 'response_cache:{namespace}:{outcome}'
+DEFAULT_TIMEOUT = 300
+SUBJECT_NAMES_TIMEOUT = 3600
+_MISSING = object()
+
+# Namespaces of decorated views, reported by stats()
+namespaces = set()
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Key evicted or never set; any fresh value orphans the old entries
+        cache.set(CATALOG_VERSION_KEY, get_catalog_version() + 1, timeout=None)
+    cache.set(CATALOG_MODIFIED_KEY, int(time.time()), timeout=None)
+
+
+def _version_state(version_key, modified_key):
+    values = cache.get_many([version_key, modified_key])
+    if len(values) < 2:
+        # First use or evicted: start now, so validators issued before the
+        # counter was lost can't match the restarted one
+        cache.add(version_key, 1, timeout=None)
+        cache.add(modified_key, int(time.time()), timeout=None)
+        values = cache.get_many([version_key, modified_key])
+    return values.get(version_key, 1), values.get(modified_key, int(time.time()))
+
+
+def catalog_state():
+    """
+    (catalog version, unix time of the last catalog change)
+    """
+    return _version_state(CATALOG_VERSION_KEY, CATALOG_MODIFIED_KEY)
+
+
+def user_state(user_id):
+    """
+    (version, unix time of the last change) of one user's own data
+    """
+    return _version_state(USER_VERSION_KEY.format(user_id=user_id), USER_MODIFIED_KEY.format(user_id=user_id))
+
+
+def bump_user_version(user_id):
+    key = USER_VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, user_state(user_id)[0] + 1, timeout=None)
+    cache.set(USER_MODIFIED_KEY.format(user_id=user_id), int(time.time()), timeout=None)
+
+
+def subject_names():
+    """
+    {str(subject id): name} for the current catalog version
+    """
+    from .models import Subject
+
+    key = f'subject_names:v{get_catalog_version()}'
+    names = cache.get(key)
+    if names is None:
+        names = {str(pk): name for pk, name in Subject.objects.values_list('pk', 'name')}
+        cache.set(key, names, SUBJECT_NAMES_TIMEOUT)
+    return names
+
+
+def normalize_query(query_dict):
+    """
+    Canonical form of a query string: sorted keys and values, blanks dropped
+    """
+    return '&'.join(
+        f'{key}={value}'
+        for key in sorted(query_dict)
+        for value in sorted(query_dict.getlist(key))
+        if value != ''
+    )
+
+
+def response_cache_key(namespace, request):
+    digest = hashlib.md5(normalize_query(request.GET).encode()).hexdigest()
+    return f'response:{namespace}:v{get_catalog_version()}:{digest}'
+
+
+def _record(namespace, outcome):
+    key = STATS_KEY.format(namespace=namespace, outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def stats():
+    """
+    Hit/miss counters per cached view
+    """
+    result = {}
+    for namespace in sorted(namespaces):
+        hits = cache.get(STATS_KEY.format(namespace=namespace, outcome='hits'), 0)
+        misses = cache.get(STATS_KEY.format(namespace=namespace, outcome='misses'), 0)
+        total = hits + misses
+        result[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0.0,
+        }
+    return result
+
+
+def cache_anonymous_response(namespace, timeout=None):
+    """
+    Cache successful responses of a DRF function view for unauthenticated GETs.
+
+    Apply it below @api_view/@permission_classes so it receives the DRF request
+    (or below async_views.async_api_view for async views).
+    """
+    namespaces.add(namespace)
+
+    def cache_timeout():
+        return timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_decorator(view, namespace, cache_timeout)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = response_cache_key(namespace, request)
+            data = cache.get(key, _MISSING)
+            if data is not _MISSING:
+                _record(namespace, 'hits')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record(namespace, 'misses')
+            response = view(request, *args, **kwargs)
+            if not isinstance(response, Response):
+                return response  # Streamed, nothing to store
+            if response.status_code == 200:
+                cache.set(key, response.data, cache_timeout())
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _async_decorator(view, namespace, cache_timeout):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return await view(request, *args, **kwargs)
+
+        key = await sync_to_async(response_cache_key)(namespace, request)
+        data = await cache.aget(key, _MISSING)
+        if data is not _MISSING:
+            await sync_to_async(_record)(namespace, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        await sync_to_async(_record)(namespace, 'misses')
+        response = await view(request, *args, **kwargs)
+        if not isinstance(response, Response):
+            return response  # Streamed, nothing to store
+        if response.status_code == 200:
+            await cache.aset(key, response.data, cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
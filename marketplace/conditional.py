@@ -0,0 +1,93 @@
+"""
+Conditional GET support (ETag / Last-Modified) for list endpoints.
+
+Validators come from the change counters in caching.py rather than from
+hashing the rendered body: the catalog version for catalog data, plus the
+user's own version for per-user responses. Checking them costs a cache read,
+so a request whose If-None-Match (or If-Modified-Since) still matches gets a
+304 before any queryset or serializer work runs. Like the anonymous response
+cache, writes that don't bump a version (buffered view counts, account name
+changes) show up once the next catalog change happens.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from . import caching
+
+
+def validators(namespace, request, per_user=False):
+    """
+    (ETag, Last-Modified unix time) for the current state of a view's data
+    """
+    version, modified = caching.catalog_state()
+    parts = [namespace, version, modified]
+    if per_user and request.user.is_authenticated:
+        user_version, user_modified = caching.user_state(request.user.pk)
+        parts += ['u', request.user.pk, user_version, user_modified]
+        modified = max(modified, user_modified)
+    return 'W/"%s"' % '.'.join(str(part) for part in parts), modified
+
+
+def _not_modified(request, etag, last_modified):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return Response(status=response.status_code)
+    return None
+
+
+def _tag(request, response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Always revalidate; per-user bodies must not be stored by shared caches
+        if request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional_response(namespace, per_user=False):
+    """
+    Add ETag/Last-Modified to a GET view and answer matching conditional requests with 304.
+
+    Apply it below @api_view/@permission_classes (so authentication and
+    permissions still run) and above cache_anonymous_response. per_user adds
+    the user's own version, for responses that include per-user data.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_decorator(view, namespace, per_user)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = validators(namespace, request, per_user)
+            response = _not_modified(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _tag(request, response, etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def _async_decorator(view, namespace, per_user):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await view(request, *args, **kwargs)
+
+        etag, last_modified = await sync_to_async(validators)(namespace, request, per_user)
+        response = _not_modified(request, etag, last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        return _tag(request, response, etag, last_modified)
+    return wrapper
@@ -0,0 +1,188 @@
+"""
+Write-buffered note view counting.
+
+Views are tallied in a buffer and flushed to Note.views by a background
+thread every VIEW_COUNT_FLUSH_INTERVAL seconds, as a handful of batched F()
+updates. Serving a note therefore never writes to the database, and hot
+notes don't contend on row locks.
+
+With VIEW_COUNT_REDIS_URL set (production) the buffer is shared by every
+worker: each view is an INCRBY on the note's counter plus its id in a dirty
+set, so a crash or restart loses nothing that was recorded. Any worker's
+flusher may drain it; a note's counter is read and deleted, and its id
+removed from the dirty set, in one MULTI/EXEC, so concurrent flushers never
+write a view twice. Only a batch already drained when its database write
+fails hard (the process dies) is lost.
+
+Without it (development) the buffer is a per-process Counter, also flushed
+when the worker exits.
+"""
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import redis
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+
+from . import seller_stats
+from .models import Note
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 10
+FLUSH_BATCH_SIZE = 500
+
+
+class LocalViewCounts:
+    """
+    Per-process buffer
+    """
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+    def pending(self, note_id=None):
+        with self._lock:
+            if note_id is None:
+                return sum(self._counts.values())
+            return self._counts.get(note_id, 0)
+
+
+class RedisViewCounts:
+    """
+    Buffer shared by every worker through Redis
+    """
+    COUNT_KEY = 'views:count:{note_id}'
+    DIRTY_KEY = 'views:dirty'
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, note_id):
+        return self.COUNT_KEY.format(note_id=note_id)
+
+    def add(self, counts):
+        pipe = self._client.pipeline(transaction=False)
+        for note_id, count in counts.items():
+            pipe.incrby(self._key(note_id), count)
+            pipe.sadd(self.DIRTY_KEY, str(note_id))
+        pipe.execute()
+
+    def drain(self):
+        counts = Counter()
+        note_ids = [member.decode() for member in self._client.smembers(self.DIRTY_KEY)]
+        for start in range(0, len(note_ids), FLUSH_BATCH_SIZE):
+            batch = note_ids[start:start + FLUSH_BATCH_SIZE]
+            # A view recorded after EXEC recreates the counter and re-adds the id
+            pipe = self._client.pipeline(transaction=True)
+            for note_id in batch:
+                pipe.get(self._key(note_id))
+                pipe.delete(self._key(note_id))
+            pipe.srem(self.DIRTY_KEY, *batch)
+            values = pipe.execute()[0:-1:2]
+            for note_id, value in zip(batch, values):
+                if value:
+                    counts[uuid.UUID(note_id)] += int(value)
+        return counts
+
+    def pending(self, note_id=None):
+        if note_id is not None:
+            return int(self._client.get(self._key(note_id)) or 0)
+        note_ids = [member.decode() for member in self._client.smembers(self.DIRTY_KEY)]
+        if not note_ids:
+            return 0
+        return sum(int(value or 0) for value in self._client.mget([self._key(pk) for pk in note_ids]))
+
+
+class ViewCountBuffer:
+    def __init__(self):
+        self._store = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+    @property
+    def store(self):
+        if self._store is None:
+            url = getattr(settings, 'VIEW_COUNT_REDIS_URL', '')
+            self._store = RedisViewCounts(url) if url else LocalViewCounts()
+        return self._store
+
+    def record(self, note_id, count=1):
+        self.store.add({note_id: count})
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='view-count-flusher', daemon=True)
+                self._thread.start()
+
+    def pending(self, note_id=None):
+        return self.store.pending(note_id)
+
+    def flush(self):
+        """
+        Write buffered counts to the database. Returns the number of views written.
+        """
+        counts = self.store.drain()
+        if not counts:
+            return 0
+
+        # Notes with the same increment share one UPDATE
+        by_increment = defaultdict(list)
+        for note_id, count in counts.items():
+            by_increment[count].append(note_id)
+
+        try:
+            with transaction.atomic():
+                for increment, note_ids in by_increment.items():
+                    for start in range(0, len(note_ids), FLUSH_BATCH_SIZE):
+                        Note.objects.filter(pk__in=note_ids[start:start + FLUSH_BATCH_SIZE]).update(
+                            views=F('views') + increment
+                        )
+                seller_stats.add_views(counts)
+        except Exception:
+            # Put the counts back so the next flush retries them
+            self.store.add(counts)
+            raise
+        return sum(counts.values())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush note view counts')
+            finally:
+                connections.close_all()
+
+
+view_counts = ViewCountBuffer()
+
+
+def record_view(note_id):
+    view_counts.record(note_id)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counts.flush()
+    except Exception:
+        logger.exception('Failed to flush note view counts on exit')
@@ -0,0 +1,152 @@
+"""
+Dashboard sections, shared by the individual dashboard endpoints and the
+combined /api/dashboard/ endpoint (sync views.py and async_views.py).
+
+stats and analytics read the same SellerStats row, so the combined endpoint
+loads it once, and the sync endpoint runs the sections' independent queries
+concurrently on a small per-process thread pool (the async views use
+run_concurrently). top_notes is the same for every user and is cached as
+serialized data per catalog version.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from . import caching, leaderboards, projection, seller_stats
+from .models import Note, Wishlist
+
+SECTIONS = ['stats', 'activity', 'top_notes', 'analytics']
+RECENT_ITEMS = 5
+ACTIVITY_LIMIT = 10
+TOP_NOTES_LIMIT = 10
+TOP_NOTES_KEY = 'dashboard:top_notes:v{version}'
+SECTION_WORKERS = 4
+
+_section_pool = ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix='dashboard-section')
+
+
+def parse_sections(value):
+    """
+    Sections named in a comma-separated ?sections= value (all when empty)
+    """
+    if not value:
+        return list(SECTIONS)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}. Choose from {', '.join(SECTIONS)}")
+    return list(dict.fromkeys(names))
+
+
+def stats_data(stats):
+    return {
+        'total_notes': stats.total_notes,
+        'total_sales': stats.total_sales,
+        'wishlist_count': stats.wishlist_count,
+        'rating': stats.rating
+    }
+
+
+def analytics_data(stats):
+    return {
+        'recent_notes': seller_stats.recent_notes(stats),
+        'total_views': stats.total_views,
+        'popular_subjects': seller_stats.popular_subjects(stats)
+    }
+
+
+def recent_notes(user):
+    return Note.objects.filter(seller=user).order_by('-created_at')[:RECENT_ITEMS]
+
+
+def recent_wishlist(user):
+    return Wishlist.objects.filter(user=user).select_related('note').order_by('-created_at')[:RECENT_ITEMS]
+
+
+def activity_data(notes, wishlist_items):
+    """
+    Merge recent notes and wishlist additions into one feed, newest first
+    """
+    activities = []
+
+    for note in notes:
+        activities.append({
+            'type': 'note_created',
+            'title': f'Created note: {note.title}',
+            'created_at': note.created_at
+        })
+
+    for wishlist_item in wishlist_items:
+        activities.append({
+            'type': 'wishlist_added',
+            'title': f'Added to wishlist: {wishlist_item.note.title}',
+            'created_at': wishlist_item.created_at
+        })
+
+    activities.sort(key=lambda x: x['created_at'], reverse=True)
+    return activities[:ACTIVITY_LIMIT]
+
+
+def top_notes():
+    """
+    Serialized top-rated notes, shared by all users until the catalog or leaderboard changes
+    """
+    key = TOP_NOTES_KEY.format(version=caching.get_catalog_version())
+    data = cache.get(key)
+    if data is None:
+        notes = leaderboards.ranked_note_rows('top_rated', limit=TOP_NOTES_LIMIT)
+        data = projection.serialize_notes(notes)
+        cache.set(key, data, leaderboards.refresh_interval())
+    return data
+
+
+def _run_section(call):
+    try:
+        return call()
+    finally:
+        # Pool threads outlive the request; release their connection per CONN_MAX_AGE
+        close_old_connections()
+
+
+def _run_concurrently(calls):
+    """
+    Run independent blocking calls at the same time on the section pool. Returns {name: result}.
+    """
+    if len(calls) < 2:
+        return {name: call() for name, call in calls.items()}
+    # Each call runs in a copy of the current context, so sqltrace observers follow it
+    futures = {
+        name: _section_pool.submit(contextvars.copy_context().run, _run_section, call)
+        for name, call in calls.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def build(user, sections):
+    """
+    The requested sections for one user, with their queries run concurrently
+    """
+    calls = {}
+    if 'stats' in sections or 'analytics' in sections:
+        calls['stats'] = partial(seller_stats.get_for_user, user)
+    if 'activity' in sections:
+        calls['recent_notes'] = lambda: list(recent_notes(user))
+        calls['recent_wishlist'] = lambda: list(recent_wishlist(user))
+    if 'top_notes' in sections:
+        calls['top_notes'] = top_notes
+    results = _run_concurrently(calls)
+
+    data = {}
+    for section in sections:
+        if section == 'stats':
+            data['stats'] = stats_data(results['stats'])
+        elif section == 'activity':
+            data['activity'] = activity_data(results['recent_notes'], results['recent_wishlist'])
+        elif section == 'top_notes':
+            data['top_notes'] = results['top_notes']
+        elif section == 'analytics':
+            data['analytics'] = analytics_data(results['stats'])
+    return data
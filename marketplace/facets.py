@@ -0,0 +1,64 @@
+"""
+Facet counts for the catalog filters.
+
+Each facet is counted with every other active filter applied but not its
+own, so the counts show what choosing a different value would return. That
+is four grouped queries, cached per normalized filter set and catalog
+version.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from . import caching, filters, pagination
+from .models import Note
+
+FACET_CACHE_TIMEOUT = 300
+
+PRICE_BUCKETS = {
+    'free': Q(is_free=True),
+    '0-100': Q(price__gte=0, price__lte=100, is_free=False),
+    '100-500': Q(price__gte=100, price__lte=500, is_free=False),
+    '500+': Q(price__gte=500, is_free=False),
+}
+
+
+def _base(params, skip):
+    notes = Note.objects.filter(is_approved=True)
+    return filters.filter_notes(notes, params, skip=(skip,), ranked=False).order_by()
+
+
+def compute(params):
+    names = caching.subject_names()
+
+    subjects = _base(params, 'subject').values('subject_id').annotate(count=Count('pk')).order_by('-count')
+    semesters = _base(params, 'semester').values('semester').annotate(count=Count('pk')).order_by('semester')
+    years = _base(params, 'year').values('year').annotate(count=Count('pk')).order_by('-year')
+    prices = _base(params, 'price').aggregate(**{
+        bucket: Count('pk', filter=condition) for bucket, condition in PRICE_BUCKETS.items()
+    })
+
+    return {
+        'subject': [
+            {'id': row['subject_id'], 'name': names.get(str(row['subject_id'])), 'count': row['count']}
+            for row in subjects
+        ],
+        'semester': [{'value': row['semester'], 'count': row['count']} for row in semesters],
+        'year': [{'value': row['year'], 'count': row['count']} for row in years],
+        'price_range': [{'value': bucket, 'count': prices[bucket]} for bucket in filters.PRICE_RANGES],
+    }
+
+
+def get_facets(request):
+    """
+    Facet counts for the filters of a listing request, cached
+    """
+    params = pagination.filter_params(request)
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    key = f'facets:v{caching.get_catalog_version()}:{digest}'
+    result = cache.get(key)
+    if result is None:
+        result = compute(request.GET)
+        cache.set(key, result, FACET_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,68 @@
+"""
+Sparse fieldsets for Note responses (?fields= / ?exclude=).
+
+parse() turns the query parameters into the list of NoteSerializer fields to
+emit; prune() restricts the queryset to the columns and joins those fields
+read, so a card grid asking for title,price,subject_name doesn't load
+descriptions or join the seller. Fields that aren't requested are removed
+from the serializer, so their lookups (such as in_wishlist) never run.
+"""
+from .serializers import NoteSerializer
+
+FIELDS = list(NoteSerializer.Meta.fields)
+
+# Model columns (and related columns) each serializer field reads
+COLUMNS = {
+    'seller_name': ['seller__name'],
+    'seller_phone': ['seller__phone'],
+    'subject_name': ['subject__name'],
+    'subject_code': ['subject__code'],
+    'avg_rating': ['rating_sum', 'review_count'],
+    'in_wishlist': [],
+}
+
+# Always loaded: cursor pagination encodes created_at
+REQUIRED_COLUMNS = ['id', 'created_at']
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def parse(params):
+    """
+    Fields selected by ?fields= and ?exclude= in NoteSerializer order, or None for all
+    """
+    fields = _names(params.get('fields', ''))
+    exclude = _names(params.get('exclude', ''))
+    if not fields and not exclude:
+        return None
+
+    unknown = [name for name in fields + exclude if name not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(FIELDS)}")
+    selected = [name for name in FIELDS if (not fields or name in fields) and name not in exclude]
+    if not selected:
+        raise ValueError('No fields left to return')
+    return selected
+
+
+def columns(fields, extra=()):
+    result = REQUIRED_COLUMNS + list(extra)
+    for name in fields:
+        for column in COLUMNS.get(name, [name]):
+            if column not in result:
+                result.append(column)
+    return result
+
+
+def prune(queryset, fields, extra=()):
+    """
+    Load only the columns and relations the selected fields need (no-op for None).
+    ``extra`` names columns the view itself reads.
+    """
+    if fields is None:
+        return queryset
+    needed = columns(fields, extra)
+    related = sorted({column.split('__')[0] for column in needed if '__' in column})
+    return queryset.select_related(None).select_related(*related).only(*needed)
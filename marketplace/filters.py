@@ -0,0 +1,71 @@
+"""
+Catalog filters shared by note_list, search_notes and the facet counts.
+"""
+from . import search as search_index
+from . import tags
+
+# price_range values offered by the frontend
+PRICE_RANGES = ['free', '0-100', '100-500', '500+']
+
+
+def filter_price_range(notes, price_range):
+    if price_range == 'free':
+        return notes.filter(is_free=True)
+    elif price_range == '0-100':
+        return notes.filter(price__gte=0, price__lte=100, is_free=False)
+    elif price_range == '100-500':
+        return notes.filter(price__gte=100, price__lte=500, is_free=False)
+    elif price_range == '500+':
+        return notes.filter(price__gte=500, is_free=False)
+    return notes
+
+
+def filter_notes(notes, params, skip=(), ranked=True):
+    """
+    Apply catalog filters from query parameters to a Note queryset.
+
+    Dimensions named in ``skip`` are left out (used for facet counts). With
+    ``ranked=False`` a search only filters and does not order by relevance.
+    """
+    # Tag filter (exact, indexed)
+    tag_names = params.getlist('tag')
+    if tag_names and 'tag' not in skip:
+        notes = tags.filter_by_tags(notes, tag_names)
+
+    # Subject filter
+    subject = params.get('subject', '')
+    if subject and 'subject' not in skip:
+        notes = notes.filter(subject_id=subject)
+
+    # Semester filter
+    semester = params.get('semester', '')
+    if semester and 'semester' not in skip:
+        notes = notes.filter(semester=semester)
+
+    # Year filter
+    year = params.get('year', '')
+    if year and 'year' not in skip:
+        notes = notes.filter(year=year)
+
+    # Price filters
+    if 'price' not in skip:
+        notes = filter_price_range(notes, params.get('price_range', ''))
+
+        price_min = params.get('price_min', '')
+        if price_min:
+            notes = notes.filter(price__gte=float(price_min))
+
+        price_max = params.get('price_max', '')
+        if price_max:
+            notes = notes.filter(price__lte=float(price_max))
+
+    # Search functionality (note_list uses ?search=, search_notes uses ?q=).
+    # Last, so relevance is ranked within the filtered notes.
+    query = params.get('search', '') or params.get('q', '')
+    if query and 'search' not in skip:
+        if ranked:
+            notes = search_index.apply_search(notes, query)
+        else:
+            notes = search_index.filter_matches(notes, query)
+
+    return notes
@@ -0,0 +1,234 @@
+"""
+Streaming bulk note ingestion from CSV or JSONL.
+
+Rows are read lazily from the input, validated and inserted in chunks
+(DEFAULT_CHUNK_SIZE rows) with one bulk_create per chunk in its own transaction,
+so memory stays constant however large the file is. Invalid rows are
+reported and skipped without aborting the batch.
+
+bulk_create bypasses model signals, so each chunk also links tags and (for
+approved notes) fills the search index itself; seller stats and the catalog
+version are refreshed once at the end.
+"""
+import codecs
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from . import caching, search, seller_stats, tags
+from .models import Note, Subject
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ('csv', 'jsonl')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+
+def detect_format(name='', content_type=''):
+    name = (name or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    return None
+
+
+def iter_rows(lines, fmt):
+    """
+    Yield (row number, dict or None, parse error) from an iterable of byte lines
+    """
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row, None
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, None, 'Each line must be a JSON object'
+            continue
+        yield number, row, None
+
+
+def _text(row, field):
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def _bool(value, default):
+    if isinstance(value, bool):
+        return value
+    value = '' if value is None else str(value).strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def clean_row(row, subject_ids):
+    """
+    Validate one input row. Returns (Note field values, errors).
+    """
+    errors = {}
+    fields = {}
+
+    for field, max_length in (('title', 200), ('description', None)):
+        value = _text(row, field)
+        if not value:
+            errors[field] = 'This field is required.'
+        elif max_length and len(value) > max_length:
+            errors[field] = f'Ensure this field has no more than {max_length} characters.'
+        fields[field] = value
+
+    subject = _text(row, 'subject')
+    if subject not in subject_ids:
+        errors['subject'] = f'Unknown subject: {subject}' if subject else 'This field is required.'
+    else:
+        fields['subject_id'] = subject_ids[subject]
+
+    try:
+        fields['semester'] = int(_text(row, 'semester'))
+        if not 1 <= fields['semester'] <= 8:
+            raise ValueError
+    except ValueError:
+        errors['semester'] = 'Semester must be a number from 1 to 8.'
+
+    try:
+        fields['year'] = int(_text(row, 'year'))
+    except ValueError:
+        errors['year'] = 'A valid year is required.'
+
+    try:
+        fields['price'] = Decimal(_text(row, 'price') or '0')
+        if fields['price'] < 0 or fields['price'] >= Decimal('1e8'):
+            raise InvalidOperation
+    except InvalidOperation:
+        errors['price'] = 'A valid non-negative price is required.'
+
+    try:
+        fields['is_free'] = _bool(row.get('is_free'), default=fields.get('price') == 0)
+    except ValueError:
+        errors['is_free'] = 'Must be true or false.'
+
+    for field, max_length in (('tags', 500), ('contact_info', 200)):
+        fields[field] = _text(row, field)
+        if len(fields[field]) > max_length:
+            errors[field] = f'Ensure this field has no more than {max_length} characters.'
+
+    return fields, errors
+
+
+class Importer:
+    def __init__(self, seller, approve=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.seller = seller
+        self.approve = approve
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.fatal_error = None
+        self._subject_ids = {}  # Input value (id or code) -> subject id
+        self._subjects = {}
+
+    def _error(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': errors})
+
+    def _resolve_subjects(self, rows):
+        # Subjects may be given by id or by code; look up unseen values once
+        wanted = {_text(row, 'subject') for number, row in rows} - set(self._subject_ids)
+        if not wanted:
+            return
+        ids = [value for value in wanted if value.isdigit()]
+        for subject in Subject.objects.filter(Q(code__in=wanted) | Q(pk__in=ids)):
+            self._subjects[subject.pk] = subject
+            if subject.code in wanted:
+                self._subject_ids[subject.code] = subject.pk
+            if str(subject.pk) in wanted:
+                self._subject_ids[str(subject.pk)] = subject.pk
+
+    def _insert(self, notes):
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            tags.sync_bulk(notes)
+            if self.approve:
+                search.index_new_notes(notes)
+
+    def _process_chunk(self, rows):
+        self._resolve_subjects(rows)
+        valid = []
+        for number, row in rows:
+            fields, errors = clean_row(row, self._subject_ids)
+            if errors:
+                self._error(number, errors)
+            else:
+                note = Note(seller=self.seller, is_approved=self.approve, **fields)
+                note.subject = self._subjects[note.subject_id]
+                valid.append((number, note))
+        if not valid:
+            return
+
+        try:
+            self._insert([note for number, note in valid])
+        except DatabaseError:
+            # Isolate the offending rows instead of dropping the whole chunk
+            for number, note in valid:
+                try:
+                    self._insert([note])
+                except DatabaseError as e:
+                    self._error(number, {'non_field_errors': str(e)})
+                else:
+                    self.created += 1
+        else:
+            self.created += len(valid)
+
+    def run(self, lines, fmt):
+        """
+        Import every row of an iterable of byte lines. Returns the summary dict.
+        """
+        chunk = []
+        try:
+            for number, row, parse_error in iter_rows(lines, fmt):
+                if parse_error:
+                    self._error(number, {'non_field_errors': parse_error})
+                    continue
+                chunk.append((number, row))
+                if len(chunk) >= self.chunk_size:
+                    self._process_chunk(chunk)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Unreadable input: keep what was imported so far and stop
+            self.fatal_error = f'Could not read input: {e}'
+        if chunk:
+            self._process_chunk(chunk)
+
+        if self.created:
+            seller_stats.rebuild_for(self.seller.pk)
+            caching.bump_catalog_version()
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'error': self.fatal_error,
+        }
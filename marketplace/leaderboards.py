@@ -0,0 +1,155 @@
+"""
+Precomputed note leaderboards.
+
+Each (kind, scope) leaderboard is a ranked list of note ids stored in a
+Leaderboard row and mirrored in the cache. Rankings read only stored columns
+(Note.rating_sum/review_count/views), are refreshed by the
+refresh_leaderboards command, and are recomputed lazily once older than
+LEADERBOARD_REFRESH_INTERVAL. Trending scans every recent note, so a stale
+trending board is served as stored and only the command refreshes it.
+Serving a leaderboard is a primary-key fetch of at most LEADERBOARD_SIZE notes.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FloatField, ExpressionWrapper
+from django.utils import timezone
+
+from . import projection
+from .models import Leaderboard, Note, Subject
+
+KINDS = [kind for kind, label in Leaderboard.KIND_CHOICES]
+SEMESTERS = range(1, 9)
+LEADERBOARD_SIZE = 50
+DEFAULT_REFRESH_INTERVAL = 300
+
+# Trending: engagement divided by (age in hours + 2) ** gravity
+TRENDING_WINDOW_DAYS = 30
+TRENDING_GRAVITY = 1.5
+TRENDING_REVIEW_WEIGHT = 5
+
+# Recomputed on read once stale; the others wait for refresh_leaderboards
+LAZY_KINDS = ('top_rated', 'most_viewed')
+
+
+def refresh_interval():
+    return getattr(settings, 'LEADERBOARD_REFRESH_INTERVAL', DEFAULT_REFRESH_INTERVAL)
+
+
+def make_scope(subject=None, semester=None):
+    if subject:
+        return f'subject:{subject}'
+    if semester:
+        return f'semester:{semester}'
+    return ''
+
+
+def parse_scope(subject='', semester=''):
+    """
+    Validate ?subject= / ?semester= and return the scope. Raises ValueError.
+    """
+    if subject:
+        try:
+            subject = int(subject)
+        except (TypeError, ValueError):
+            raise ValueError('subject must be a subject id')
+        if not Subject.objects.filter(pk=subject).exists():
+            raise ValueError(f'Unknown subject: {subject}')
+    if semester:
+        try:
+            semester = int(semester)
+        except (TypeError, ValueError):
+            semester = None
+        if semester not in SEMESTERS:
+            raise ValueError(f'semester must be between {SEMESTERS[0]} and {SEMESTERS[-1]}')
+    return make_scope(subject=subject, semester=semester)
+
+
+def _cache_key(kind, scope):
+    return f'leaderboard:{kind}:{scope}'
+
+
+def _candidates(scope):
+    notes = Note.objects.filter(is_approved=True)
+    if scope.startswith('subject:'):
+        notes = notes.filter(subject_id=scope.split(':', 1)[1])
+    elif scope.startswith('semester:'):
+        notes = notes.filter(semester=scope.split(':', 1)[1])
+    return notes.order_by()
+
+
+def compute(kind, scope=''):
+    """
+    Rank notes for one leaderboard. Returns up to LEADERBOARD_SIZE note ids as strings.
+    """
+    notes = _candidates(scope)
+
+    if kind == 'top_rated':
+        ranked = notes.filter(review_count__gt=0).annotate(
+            average_rating=ExpressionWrapper(F('rating_sum') * 1.0 / F('review_count'), output_field=FloatField())
+        ).order_by('-average_rating', '-views').values_list('pk', flat=True)[:LEADERBOARD_SIZE]
+        return [str(pk) for pk in ranked]
+
+    if kind == 'most_viewed':
+        ranked = notes.order_by('-views', '-created_at').values_list('pk', flat=True)[:LEADERBOARD_SIZE]
+        return [str(pk) for pk in ranked]
+
+    if kind == 'trending':
+        now = timezone.now()
+        recent = notes.filter(created_at__gte=now - timedelta(days=TRENDING_WINDOW_DAYS)).values_list(
+            'pk', 'views', 'review_count', 'created_at'
+        )
+        scored = []
+        for pk, views, review_count, created_at in recent.iterator(chunk_size=2000):
+            age_hours = max((now - created_at).total_seconds() / 3600, 0)
+            engagement = views + TRENDING_REVIEW_WEIGHT * review_count
+            scored.append((engagement / (age_hours + 2) ** TRENDING_GRAVITY, str(pk)))
+        scored.sort(reverse=True)
+        return [pk for score, pk in scored[:LEADERBOARD_SIZE]]
+
+    raise ValueError(f'Unknown leaderboard: {kind}')
+
+
+def refresh(kind, scope=''):
+    note_ids = compute(kind, scope)
+    Leaderboard.objects.update_or_create(
+        kind=kind, scope=scope,
+        defaults={'note_ids': note_ids, 'computed_at': timezone.now()}
+    )
+    cache.set(_cache_key(kind, scope), note_ids, refresh_interval())
+    return note_ids
+
+
+def refresh_all():
+    """
+    Refresh every kind for the global, per-subject and per-semester scopes
+    """
+    scopes = [''] + [make_scope(subject=pk) for pk in Subject.objects.values_list('pk', flat=True)]
+    scopes += [make_scope(semester=semester) for semester in SEMESTERS]
+    for scope in scopes:
+        for kind in KINDS:
+            refresh(kind, scope)
+    return len(scopes) * len(KINDS)
+
+
+def ranked_ids(kind, scope=''):
+    note_ids = cache.get(_cache_key(kind, scope))
+    if note_ids is not None:
+        return note_ids
+
+    board = Leaderboard.objects.filter(kind=kind, scope=scope).first()
+    if board is None:
+        # Only scopes from parse_scope() or refresh_all() get here, so rows stay bounded
+        return refresh(kind, scope)
+    if kind in LAZY_KINDS and board.computed_at < timezone.now() - timedelta(seconds=refresh_interval()):
+        return refresh(kind, scope)
+    cache.set(_cache_key(kind, scope), board.note_ids, refresh_interval())
+    return board.note_ids
+
+
+def ranked_note_rows(kind, scope='', limit=10):
+    """
+    Notes of a leaderboard in rank order, as projection.note_values() rows
+    """
+    return projection.ordered_note_values(ranked_ids(kind, scope)[:limit])
@@ -0,0 +1,116 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from marketplace import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark API endpoints (latency percentiles, throughput, SQL query counts) and fail '
+        'when results regress past a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', dest='scenarios', choices=[s.name for s in benchmarks.SCENARIOS],
+                            help='Run only this scenario (repeatable)')
+        parser.add_argument('--requests', type=int, default=50, help='Sequential requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests before measuring')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients for throughput (0 to skip)')
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds of concurrent load per scenario')
+        parser.add_argument('--phone', default='9876543210', help='Account used for authenticated scenarios and login')
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--output', help='Write results JSON to this file')
+        parser.add_argument('--baseline', help='Compare against this results JSON')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline instead of comparing')
+        parser.add_argument('--latency-threshold', type=float, default=benchmarks.DEFAULT_LATENCY_THRESHOLD,
+                            help='Allowed relative slowdown, e.g. 0.3 for 30%%')
+        parser.add_argument('--query-threshold', type=int, default=benchmarks.DEFAULT_QUERY_THRESHOLD,
+                            help='Allowed extra SQL queries per request')
+        parser.add_argument('--no-cache', action='store_true', help='Run with a dummy cache backend')
+        # Seed a synthetic dataset (see populate_data) in a temporary test database
+        parser.add_argument('--seed-users', type=int, default=0)
+        parser.add_argument('--seed-notes', type=int, default=0)
+        parser.add_argument('--seed-reviews', type=int, default=0)
+        parser.add_argument('--seed-wishlists', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline PATH')
+
+        seed = {name: options[f'seed_{name}'] for name in ('users', 'notes', 'reviews', 'wishlists')}
+        if not any(seed.values()):
+            self.benchmark(options)
+            return
+
+        # Seeded runs build and measure a throwaway test database, never the configured one
+        self.stdout.write('Creating a temporary test database for the seeded dataset...')
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set()
+        )
+        try:
+            call_command('populate_data', stdout=self.stdout)  # Sample accounts, including --phone's default
+            call_command('populate_data', **seed, stdout=self.stdout)
+            self.benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def benchmark(self, options):
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['no_cache']:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        with override_settings(**overrides):
+            try:
+                token = benchmarks.login(options['phone'], options['password'])
+            except ValueError as e:
+                raise CommandError(f'{e}. Run populate_data first or pass --phone/--password.')
+
+            context = {'phone': options['phone'], 'password': options['password'], 'token': token}
+            self.stdout.write(f"{'scenario':<26}{'status':>7}{'queries':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+            results = benchmarks.run(
+                context, names=options['scenarios'], log=self.log_result,
+                requests=options['requests'], warmup=options['warmup'],
+                concurrency=options['concurrency'], duration=options['duration'],
+            )
+
+        if options['output']:
+            self.write_json(options['output'], results)
+
+        baseline_path = options['baseline']
+        if not baseline_path:
+            return
+        if options['save_baseline']:
+            self.write_json(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline to {baseline_path}'))
+            return
+        if not os.path.exists(baseline_path):
+            raise CommandError(f'Baseline {baseline_path} not found; create it with --save-baseline')
+
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = benchmarks.compare(
+            results, baseline,
+            latency_threshold=options['latency_threshold'], query_threshold=options['query_threshold'],
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+
+    def log_result(self, name, result):
+        queries = f"{result['queries_cold']}/{result['queries_warm']}"
+        throughput = result['throughput_rps'] if result['throughput_rps'] is not None else '-'
+        self.stdout.write(
+            f"{name:<26}{result['status']:>7}{queries:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}{throughput:>10}"
+        )
+
+    def write_json(self, path, results):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
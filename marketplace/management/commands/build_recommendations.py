@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from marketplace import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute "students also saved" related notes from wishlists and favourable reviews '
+        '(run periodically, e.g. nightly from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--similarity', choices=recommendations.SIMILARITIES, default='cosine')
+        parser.add_argument('--top-k', type=int, default=recommendations.TOP_K, help='Related notes kept per note')
+        parser.add_argument('--min-support', type=int, default=recommendations.MIN_SUPPORT,
+                            help='Students two notes must share to be related')
+        parser.add_argument('--max-items-per-user', type=int, default=recommendations.MAX_ITEMS_PER_USER,
+                            help='Notes counted per student')
+        parser.add_argument('--max-pairs-per-pass', type=int, default=recommendations.MAX_PAIRS_PER_PASS,
+                            help='Co-occurrence counts computed per block of notes')
+        parser.add_argument('--chunk-size', type=int, default=recommendations.CHUNK_SIZE,
+                            help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        for option in ['top_k', 'min_support', 'max_items_per_user', 'max_pairs_per_pass', 'chunk_size']:
+            if options[option] < 1:
+                raise CommandError(f'--{option.replace("_", "-")} must be at least 1')
+
+        self.stdout.write('Building related notes...')
+        started = time.monotonic()
+        summary = recommendations.build(
+            similarity=options['similarity'],
+            top_k=options['top_k'],
+            min_support=options['min_support'],
+            max_items=options['max_items_per_user'],
+            max_pairs=options['max_pairs_per_pass'],
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Related notes for {summary['notes']} notes from {summary['students']} students "
+            f"({summary['pairs']} pairs, {summary['partitions']} blocks, {summary['removed']} stale rows removed) "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
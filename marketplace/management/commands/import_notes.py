@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from marketplace import ingest
+from marketplace.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Bulk import notes from a CSV or JSONL file (use - for stdin)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file, or - to read stdin')
+        parser.add_argument('--seller', required=True, help='Phone number of the account the notes are listed under')
+        parser.add_argument('--input-format', choices=ingest.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--approve', action='store_true', help='Publish the imported notes immediately')
+        parser.add_argument('--chunk-size', type=int, default=ingest.DEFAULT_CHUNK_SIZE, help='Rows inserted per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            seller = Account.objects.get(phone=options['seller'])
+        except Account.DoesNotExist:
+            raise CommandError(f"No account with phone number {options['seller']}")
+
+        path = options['path']
+        fmt = options['input_format'] or ingest.detect_format(name=path)
+        if fmt is None:
+            raise CommandError('Cannot tell the input format from the file name; pass --input-format')
+
+        importer = ingest.Importer(seller, approve=options['approve'], chunk_size=options['chunk_size'])
+        if path == '-':
+            summary = importer.run(sys.stdin.buffer, fmt)
+        else:
+            with open(path, 'rb') as lines:
+                summary = importer.run(lines, fmt)
+
+        for error in summary['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if summary['errors_truncated']:
+            self.stderr.write(f"... {summary['failed'] - len(summary['errors'])} more rows failed")
+        if summary['error']:
+            self.stderr.write(summary['error'])
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary['created']} notes ({summary['failed']} failed)"))
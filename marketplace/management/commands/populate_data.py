@@ -1,35 +1,90 @@
 from django.core.management.base import BaseCommand
 from marketplace.models import Subject, Account, UserProfile, Note
 from django.contrib.auth.hashers import make_password
+from marketplace.synthetic import SyntheticDataGenerator
 import random
 
+SUBJECTS_DATA = [
+    {'name': 'Computer Science', 'code': 'CS101', 'description': 'Introduction to Computer Science'},
+    {'name': 'Data Structures', 'code': 'CS201', 'description': 'Fundamental data structures and algorithms'},
+    {'name': 'Database Systems', 'code': 'CS301', 'description': 'Database design and management'},
+    {'name': 'Web Development', 'code': 'CS401', 'description': 'Modern web development technologies'},
+    {'name': 'Machine Learning', 'code': 'CS501', 'description': 'Introduction to machine learning'},
+    {'name': 'Software Engineering', 'code': 'CS601', 'description': 'Software development methodologies'},
+    {'name': 'Computer Networks', 'code': 'CS701', 'description': 'Network protocols and architecture'},
+    {'name': 'Operating Systems', 'code': 'CS801', 'description': 'OS concepts and implementation'},
+    {'name': 'Mathematics', 'code': 'MATH101', 'description': 'Calculus and linear algebra'},
+    {'name': 'Physics', 'code': 'PHY101', 'description': 'Classical mechanics and thermodynamics'},
+    {'name': 'Chemistry', 'code': 'CHEM101', 'description': 'General chemistry principles'},
+    {'name': 'Biology', 'code': 'BIO101', 'description': 'Cell biology and genetics'},
+    {'name': 'Economics', 'code': 'ECO101', 'description': 'Micro and macroeconomics'},
+    {'name': 'Business Management', 'code': 'BUS101', 'description': 'Business administration fundamentals'},
+    {'name': 'Marketing', 'code': 'MKT101', 'description': 'Marketing strategies and consumer behavior'},
+]
+
+NOTE_TITLES = [
+    'Complete Data Structures Notes',
+    'Database Systems Study Guide',
+    'Web Development Fundamentals',
+    'Machine Learning Algorithms',
+    'Software Engineering Best Practices',
+    'Computer Networks Protocols',
+    'Operating Systems Concepts',
+    'Calculus Complete Notes',
+    'Physics Lab Manual',
+    'Chemistry Practical Guide',
+    'Biology Cell Structure Notes',
+    'Economics Market Analysis',
+    'Business Management Strategies',
+    'Marketing Case Studies',
+    'Advanced Programming Concepts'
+]
+
+DESCRIPTIONS = [
+    'Comprehensive notes covering all data structures including arrays, linked lists, trees, graphs, and algorithms.',
+    'Complete study material for database systems including SQL, normalization, and database design.',
+    'Fundamental concepts of web development including HTML, CSS, JavaScript, and modern frameworks.',
+    'Detailed notes on machine learning algorithms, neural networks, and deep learning concepts.',
+    'Best practices in software engineering including agile methodologies and design patterns.',
+    'Complete guide to computer network protocols, TCP/IP, and network architecture.',
+    'Operating system concepts including process management, memory management, and file systems.',
+    'Comprehensive calculus notes covering differentiation, integration, and applications.',
+    'Complete physics lab manual with experiments and theoretical background.',
+    'Chemistry practical guide with laboratory procedures and safety protocols.',
+    'Detailed notes on cell biology, genetics, and molecular biology.',
+    'Market analysis and economic theories with real-world examples.',
+    'Business management strategies and organizational behavior concepts.',
+    'Marketing case studies and consumer behavior analysis.',
+    'Advanced programming concepts including design patterns and software architecture.'
+]
+
 class Command(BaseCommand):
-    help = 'Populate database with sample data for NotesHub'
+    help = (
+        'Populate database with sample data for NotesHub. Pass --users/--notes/--reviews/--wishlists '
+        'to generate a large, skewed synthetic dataset instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Synthetic accounts to generate')
+        parser.add_argument('--notes', type=int, default=0, help='Synthetic notes to generate')
+        parser.add_argument('--reviews', type=int, default=0, help='Synthetic reviews to attempt (duplicates are skipped)')
+        parser.add_argument('--wishlists', type=int, default=0, help='Synthetic wishlist entries to attempt (duplicates are skipped)')
+        parser.add_argument('--orders', type=int, default=0, help='Synthetic orders to generate')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed produces the same dataset')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--skip-search-index', action='store_true', help='Do not rebuild the search index afterwards')
 
     def handle(self, *args, **options):
+        if any(options[name] for name in ('users', 'notes', 'reviews', 'wishlists', 'orders')):
+            SyntheticDataGenerator(self, SUBJECTS_DATA, NOTE_TITLES, DESCRIPTIONS, **options).run()
+            return
+        
         self.stdout.write('Creating sample data...')
         
         # Create subjects
-        subjects_data = [
-            {'name': 'Computer Science', 'code': 'CS101', 'description': 'Introduction to Computer Science'},
-            {'name': 'Data Structures', 'code': 'CS201', 'description': 'Fundamental data structures and algorithms'},
-            {'name': 'Database Systems', 'code': 'CS301', 'description': 'Database design and management'},
-            {'name': 'Web Development', 'code': 'CS401', 'description': 'Modern web development technologies'},
-            {'name': 'Machine Learning', 'code': 'CS501', 'description': 'Introduction to machine learning'},
-            {'name': 'Software Engineering', 'code': 'CS601', 'description': 'Software development methodologies'},
-            {'name': 'Computer Networks', 'code': 'CS701', 'description': 'Network protocols and architecture'},
-            {'name': 'Operating Systems', 'code': 'CS801', 'description': 'OS concepts and implementation'},
-            {'name': 'Mathematics', 'code': 'MATH101', 'description': 'Calculus and linear algebra'},
-            {'name': 'Physics', 'code': 'PHY101', 'description': 'Classical mechanics and thermodynamics'},
-            {'name': 'Chemistry', 'code': 'CHEM101', 'description': 'General chemistry principles'},
-            {'name': 'Biology', 'code': 'BIO101', 'description': 'Cell biology and genetics'},
-            {'name': 'Economics', 'code': 'ECO101', 'description': 'Micro and macroeconomics'},
-            {'name': 'Business Management', 'code': 'BUS101', 'description': 'Business administration fundamentals'},
-            {'name': 'Marketing', 'code': 'MKT101', 'description': 'Marketing strategies and consumer behavior'},
-        ]
         
         subjects = []
-        for subject_data in subjects_data:
+        for subject_data in SUBJECTS_DATA:
             subject, created = Subject.objects.get_or_create(
                 code=subject_data['code'],
                 defaults=subject_data
@@ -80,47 +135,13 @@ class Command(BaseCommand):
                 self.stdout.write(f'Created profile for: {user.name}')
         
         # Create sample notes
-        note_titles = [
-            'Complete Data Structures Notes',
-            'Database Systems Study Guide',
-            'Web Development Fundamentals',
-            'Machine Learning Algorithms',
-            'Software Engineering Best Practices',
-            'Computer Networks Protocols',
-            'Operating Systems Concepts',
-            'Calculus Complete Notes',
-            'Physics Lab Manual',
-            'Chemistry Practical Guide',
-            'Biology Cell Structure Notes',
-            'Economics Market Analysis',
-            'Business Management Strategies',
-            'Marketing Case Studies',
-            'Advanced Programming Concepts'
-        ]
         
-        descriptions = [
-            'Comprehensive notes covering all data structures including arrays, linked lists, trees, graphs, and algorithms.',
-            'Complete study material for database systems including SQL, normalization, and database design.',
-            'Fundamental concepts of web development including HTML, CSS, JavaScript, and modern frameworks.',
-            'Detailed notes on machine learning algorithms, neural networks, and deep learning concepts.',
-            'Best practices in software engineering including agile methodologies and design patterns.',
-            'Complete guide to computer network protocols, TCP/IP, and network architecture.',
-            'Operating system concepts including process management, memory management, and file systems.',
-            'Comprehensive calculus notes covering differentiation, integration, and applications.',
-            'Complete physics lab manual with experiments and theoretical background.',
-            'Chemistry practical guide with laboratory procedures and safety protocols.',
-            'Detailed notes on cell biology, genetics, and molecular biology.',
-            'Market analysis and economic theories with real-world examples.',
-            'Business management strategies and organizational behavior concepts.',
-            'Marketing case studies and consumer behavior analysis.',
-            'Advanced programming concepts including design patterns and software architecture.'
-        ]
         
         for i in range(20):
             user = random.choice(users)
             subject = random.choice(subjects)
-            title = random.choice(note_titles)
-            description = random.choice(descriptions)
+            title = random.choice(NOTE_TITLES)
+            description = random.choice(DESCRIPTIONS)
             
             note = Note.objects.create(
                 seller=user,
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from marketplace import profiling
+
+
+class Command(BaseCommand):
+    help = 'Print a signed X-Profile header value that profiles the requests it is sent with'
+
+    def handle(self, *args, **options):
+        max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', profiling.DEFAULT_TOKEN_MAX_AGE)
+        self.stdout.write(profiling.make_token())
+        self.stderr.write(f'Valid for {max_age} seconds. Send it as: X-Profile: <token>')
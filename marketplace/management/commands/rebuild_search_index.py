@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from marketplace import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for approved notes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Notes indexed per transaction')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding search index...')
+        indexed = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} notes'))
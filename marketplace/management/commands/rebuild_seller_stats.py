@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from marketplace import seller_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute materialized seller statistics and the rating/sales fields on user profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Accounts recomputed per transaction')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding seller stats...')
+        written = seller_stats.rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {written} accounts'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from marketplace import ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored note rating aggregates that drifted from the reviews table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notes updated per query')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconciling note ratings...')
+        fixed = ratings.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Fixed {fixed} notes'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from marketplace import leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Recompute the top-rated, most-viewed and trending note leaderboards (run periodically, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Refreshing leaderboards...')
+        refreshed = leaderboards.refresh_all()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} leaderboards'))
@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from marketplace import fieldsets, projection
+from marketplace.models import Note, Wishlist
+from marketplace.serializers import NoteSerializer, WishlistSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that the values()-based projection serializers render exactly what NoteSerializer and '
+        'WishlistSerializer render, and compare their per-row CPU cost'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows per case')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed serialization passes per case (best is reported)')
+        parser.add_argument('--fields', default='title,price,subject_name',
+                            help='Sparse fieldset checked in addition to all fields')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        try:
+            sparse = fieldsets.parse({'fields': options['fields']})
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        notes = Note.objects.filter(is_approved=True)[:rows]
+        wishlist = Wishlist.objects.all()[:rows]
+        cases = [
+            (
+                'notes',
+                lambda: list(notes.select_related('seller', 'subject')),
+                lambda items: NoteSerializer(items, many=True).data,
+                lambda: list(projection.note_values(notes)),
+                projection.serialize_notes,
+            ),
+            (
+                f'notes ?fields={options["fields"]}',
+                lambda: list(fieldsets.prune(notes, sparse)),
+                lambda items: NoteSerializer(items, many=True, fields=sparse).data,
+                lambda: list(projection.note_values(notes, sparse)),
+                lambda items: projection.serialize_notes(items, sparse),
+            ),
+            (
+                'wishlist',
+                lambda: list(wishlist.select_related('note__seller', 'note__subject')),
+                lambda items: WishlistSerializer(items, many=True).data,
+                lambda: list(projection.wishlist_values(wishlist)),
+                projection.serialize_wishlist,
+            ),
+        ]
+
+        renderer = JSONRenderer()
+        failed = False
+        for name, load, serialize, load_rows, serialize_rows in cases:
+            instances, values = load(), load_rows()
+            if not instances:
+                self.stdout.write(self.style.WARNING(f'{name}: no rows, skipped'))
+                continue
+
+            expected, actual = serialize(instances), serialize_rows(values)
+            if renderer.render(expected) != renderer.render(actual):
+                failed = True
+                self.stdout.write(self.style.ERROR(f'{name}: output differs'))
+                for position, (left, right) in enumerate(zip(expected, actual)):
+                    if renderer.render(left) != renderer.render(right):
+                        self.stdout.write(f'  row {position}:\n    serializer: {dict(left)}\n    projection: {right}')
+                        break
+                continue
+
+            serializer_us = self.per_row_cpu(serialize, instances, options['repeat'])
+            projection_us = self.per_row_cpu(serialize_rows, values, options['repeat'])
+            self.stdout.write(
+                f'{name}: {len(instances)} identical rows, serializer {serializer_us:.1f} us/row, '
+                f'projection {projection_us:.1f} us/row ({serializer_us / projection_us:.1f}x)'
+            )
+
+        if failed:
+            raise CommandError('Projection output differs from the DRF serializers')
+        self.stdout.write(self.style.SUCCESS('Projection output matches'))
+
+    def per_row_cpu(self, serialize, items, repeat):
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.process_time()
+            serialize(items)
+            elapsed = time.process_time() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best / len(items) * 1e6
@@ -0,0 +1,333 @@
+"""
+Request metrics in Prometheus text format.
+
+MetricsMiddleware records, per view and method, a latency histogram, SQL
+query count and time (via sqltrace, so queries on worker threads count too),
+response sizes and status codes into the module-level registry. Recording is
+a few bisects and additions under one lock, so the overhead per request is
+small.
+
+Each worker process keeps its own registry, and workers behind one port are
+a single scrape target, so a scrape only reaches one of them. With
+METRICS_REDIS_URL set (production) every worker publishes its registry to
+Redis every METRICS_PUBLISH_INTERVAL seconds and /api/metrics/ returns the
+sum, at most one interval behind for the other workers. Without it the
+endpoint reports only the worker that served the scrape, which is accurate
+for a single worker process.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import sqltrace
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'noteshub'
+DEFAULT_PUBLISH_INTERVAL = 15
+STALE_INTERVALS = 4  # Missed publishes before a worker's snapshot is dropped
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+UNMATCHED_VIEW = 'unmatched'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket', {**labels, 'le': str(bound)}, cumulative
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+    def state(self):
+        return [list(self.counts), self.sum, self.count]
+
+    def merge(self, state):
+        counts, total, count = state
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+        self.sum += total
+        self.count += count
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.query_seconds = 0.0
+        self.statuses = {}
+
+    def state(self):
+        # JSON-safe, for sharing with other workers
+        return {
+            'latency': self.latency.state(),
+            'queries': self.queries.state(),
+            'response_size': self.response_size.state(),
+            'query_seconds': self.query_seconds,
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+        }
+
+    def merge(self, state):
+        self.latency.merge(state['latency'])
+        self.queries.merge(state['queries'])
+        self.response_size.merge(state['response_size'])
+        self.query_seconds += state['query_seconds']
+        for status, count in state['statuses'].items():
+            self.statuses[int(status)] = self.statuses.get(int(status), 0) + count
+
+
+class Registry:
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def observe(self, view, method, status, duration, queries, query_seconds, size=None):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = ViewMetrics()
+            metrics.latency.observe(duration)
+            metrics.queries.observe(queries)
+            metrics.query_seconds += query_seconds
+            if size is not None:
+                metrics.response_size.observe(size)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        """
+        JSON-safe copy of the registry
+        """
+        with self._lock:
+            views = [[view, method, metrics.state()] for (view, method), metrics in self._views.items()]
+        return {'started_at': self.started_at, 'views': views}
+
+    def render(self):
+        """
+        This process's registry in Prometheus text exposition format (0.0.4)
+        """
+        return render([self.snapshot()])
+
+
+def render(snapshots):
+    """
+    The sum of registry snapshots in Prometheus text exposition format (0.0.4)
+    """
+    views = {}
+    for snapshot in snapshots:
+        for view, method, state in snapshot['views']:
+            metrics = views.get((view, method))
+            if metrics is None:
+                metrics = views[(view, method)] = ViewMetrics()
+            metrics.merge(state)
+    merged = sorted(views.items())
+
+    lines = []
+    families = [
+        ('http_request_duration_seconds', 'histogram', 'Request latency by view', lambda m: m.latency),
+        ('db_queries_per_request', 'histogram', 'SQL queries issued per request', lambda m: m.queries),
+        ('http_response_size_bytes', 'histogram', 'Response body size', lambda m: m.response_size),
+    ]
+    for name, kind, help_text, get in families:
+        name = f'{PREFIX}_{name}'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for (view, method), metrics in merged:
+            for sample, labels, value in get(metrics).samples(name, {'view': view, 'method': method}):
+                lines.append(_line(sample, labels, value))
+
+    name = f'{PREFIX}_db_query_duration_seconds_total'
+    lines += [f'# HELP {name} Time spent in SQL queries', f'# TYPE {name} counter']
+    for (view, method), metrics in merged:
+        lines.append(_line(name, {'view': view, 'method': method}, metrics.query_seconds))
+
+    name = f'{PREFIX}_http_requests_total'
+    lines += [f'# HELP {name} Requests by view, method and status code', f'# TYPE {name} counter']
+    for (view, method), metrics in merged:
+        for status, count in sorted(metrics.statuses.items()):
+            lines.append(_line(name, {'view': view, 'method': method, 'status': str(status)}, count))
+
+    name = f'{PREFIX}_process_start_time_seconds'
+    started_at = min((snapshot['started_at'] for snapshot in snapshots), default=time.time())
+    lines += [f'# HELP {name} Start time of the oldest process', f'# TYPE {name} gauge', _line(name, {}, started_at)]
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _line(name, labels, value):
+    if isinstance(value, float):
+        value = repr(round(value, 6))
+    if not labels:
+        return f'{name} {value}'
+    rendered = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+    return f'{name}{{{rendered}}} {value}'
+
+
+registry = Registry()
+
+
+class SharedRegistries:
+    """
+    Every worker's registry, through Redis: each process writes its snapshot
+    to one hash field every METRICS_PUBLISH_INTERVAL seconds (and when it
+    serves a scrape), and a scrape sums the fresh ones
+    """
+    KEY = 'metrics:processes'
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'METRICS_PUBLISH_INTERVAL', DEFAULT_PUBLISH_INTERVAL)
+
+    @property
+    def process_id(self):
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def start(self):
+        """
+        Start this process's publisher thread (once per process, so forked workers get their own)
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='metrics-publisher', daemon=True).start()
+
+    def publish(self):
+        snapshot = {**registry.snapshot(), 'published_at': time.time()}
+        self._client.hset(self.KEY, self.process_id, json.dumps(snapshot))
+
+    def collect(self):
+        """
+        Snapshots of the live workers. Exited workers age out after a few
+        intervals, which Prometheus sees as a counter reset.
+        """
+        self.publish()
+        cutoff = time.time() - STALE_INTERVALS * self.interval
+        snapshots, stale = [], []
+        for field, value in self._client.hgetall(self.KEY).items():
+            snapshot = json.loads(value)
+            if snapshot['published_at'] < cutoff:
+                stale.append(field)
+            else:
+                snapshots.append(snapshot)
+        if stale:
+            self._client.hdel(self.KEY, *stale)
+        return snapshots
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.publish()
+            except Exception:
+                logger.exception('Failed to publish request metrics')
+
+
+_shared = None
+
+
+def _shared_registries():
+    global _shared
+    url = getattr(settings, 'METRICS_REDIS_URL', '')
+    if not url:
+        return None
+    if _shared is None:
+        _shared = SharedRegistries(url)
+    return _shared
+
+
+def render_all():
+    """
+    Metrics of every worker when METRICS_REDIS_URL is set, otherwise of this process
+    """
+    shared = _shared_registries()
+    if shared is None:
+        return registry.render()
+    return render(shared.collect())
+
+
+class QueryTimer:
+    """
+    sqltrace observer counting queries and their total time
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, sql, started, duration):
+        with self._lock:
+            self.seconds += duration
+            self.count += 1
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with sqltrace.observe(QueryTimer()) as timer:
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with sqltrace.observe(QueryTimer()) as timer:
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def record(self, request, response, duration, timer):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNMATCHED_VIEW
+        size = None if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, timer.count, timer.seconds, size)
+        shared = _shared_registries()
+        if shared is not None:
+            shared.start()
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('note', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='marketplace.note')),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='marketplace.note')),
+            ],
+            options={
+                'unique_together': {('term', 'note')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['is_approved', '-created_at', '-id'], name='note_approved_created_idx'),
+        ),
+    ]
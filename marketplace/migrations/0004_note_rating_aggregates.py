@@ -0,0 +1,40 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:17
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Note = apps.get_model('marketplace', 'Note')
+    Review = apps.get_model('marketplace', 'Review')
+    reviews = Review.objects.filter(note=OuterRef('pk')).order_by().values('note')
+    Note.objects.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'), output_field=IntegerField()), 0
+        ),
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_note_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
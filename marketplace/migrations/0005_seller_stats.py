@@ -0,0 +1,31 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0004_note_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seller_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_notes', models.IntegerField(default=0)),
+                ('total_views', models.BigIntegerField(default=0)),
+                ('wishlist_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('total_sales', models.IntegerField(default=0)),
+                ('total_purchases', models.IntegerField(default=0)),
+                ('notes_by_day', models.JSONField(blank=True, default=dict)),
+                ('notes_by_subject', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:21
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_seller_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('top_rated', 'Top Rated'), ('most_viewed', 'Most Viewed'), ('trending', 'Trending')], max_length=20)),
+                ('scope', models.CharField(blank=True, max_length=30)),
+                ('note_ids', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('kind', 'scope')},
+            },
+        ),
+    ]
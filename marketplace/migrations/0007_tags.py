@@ -0,0 +1,58 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:22
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def split_note_tags(apps, schema_editor):
+    # Mirrors marketplace.tags.parse_tags at the time of this migration
+    Note = apps.get_model('marketplace', 'Note')
+    Tag = apps.get_model('marketplace', 'Tag')
+    NoteTag = Note.tag_set.through
+
+    tag_ids = {}
+    links = []
+
+    def flush():
+        NoteTag.objects.bulk_create(links, ignore_conflicts=True)
+        links.clear()
+
+    for note_id, value in Note.objects.exclude(tags='').values_list('id', 'tags').iterator(chunk_size=BATCH_SIZE):
+        names = [re.sub(r'\s+', ' ', part).strip().lower()[:50] for part in value.split(',')]
+        for name in dict.fromkeys(name for name in names if name):
+            if name not in tag_ids:
+                tag_ids[name] = Tag.objects.get_or_create(name=name)[0].pk
+            links.append(NoteTag(note_id=note_id, tag_id=tag_ids[name]))
+        if len(links) >= BATCH_SIZE:
+            flush()
+    if links:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='notes', to='marketplace.tag'),
+        ),
+        migrations.RunPython(split_note_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.21 on 2026-10-17 04:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0008_request_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedNotes',
+            fields=[
+                ('note', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related_notes', serialize=False, to='marketplace.note')),
+                ('neighbors', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'related notes',
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.21 on 2026-10-17 06:02
+
+import re
+from collections import Counter
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+# Mirrors marketplace.search at the time of this migration
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'into', 'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with',
+])
+FIELD_WEIGHTS = {'title': 3, 'subject': 2, 'tags': 2, 'description': 1}
+MAX_TERM_LENGTH = 64
+
+
+def document_terms(note):
+    fields = {
+        'title': note.title,
+        'subject': f'{note.subject.name} {note.subject.code}',
+        'tags': note.tags,
+        'description': note.description,
+    }
+    frequencies = Counter()
+    for field, text in fields.items():
+        for token in TOKEN_RE.findall((text or '').lower()):
+            if token not in STOP_WORDS:
+                frequencies[token[:MAX_TERM_LENGTH]] += FIELD_WEIGHTS[field]
+    return frequencies
+
+
+def index_existing_notes(apps, schema_editor):
+    # Notes created before 0002 were never indexed; notes indexed since are skipped
+    Note = apps.get_model('marketplace', 'Note')
+    SearchDocument = apps.get_model('marketplace', 'SearchDocument')
+    SearchPosting = apps.get_model('marketplace', 'SearchPosting')
+
+    documents, postings = [], []
+
+    def flush():
+        SearchDocument.objects.bulk_create(documents, ignore_conflicts=True)
+        SearchPosting.objects.bulk_create(postings, batch_size=BATCH_SIZE * 10, ignore_conflicts=True)
+        documents.clear()
+        postings.clear()
+
+    notes = (
+        Note.objects.filter(is_approved=True, search_document__isnull=True)
+        .select_related('subject').order_by('pk')
+    )
+    for note in notes.iterator(chunk_size=BATCH_SIZE):
+        frequencies = document_terms(note)
+        documents.append(SearchDocument(note_id=note.pk, length=sum(frequencies.values())))
+        postings.extend(
+            SearchPosting(term=term, note_id=note.pk, frequency=frequency)
+            for term, frequency in frequencies.items()
+        )
+        if len(documents) >= BATCH_SIZE:
+            flush()
+    if documents:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0009_related_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_notes, migrations.RunPython.noop),
+    ]
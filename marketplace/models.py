@@ -68,6 +68,15 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.phone} - {self.student_id}"
 
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)  # Normalized: lowercase, single spaces
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        ordering = ['name']
+
 class Note(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     seller = models.ForeignKey('Account', on_delete=models.CASCADE, related_name='notes_sold')
@@ -87,9 +96,12 @@ class Note(models.Model):
     ])
     year = models.IntegerField()
     tags = models.CharField(max_length=500, blank=True)  # Comma-separated tags
+    tag_set = models.ManyToManyField(Tag, related_name='notes', blank=True)  # Kept in sync with tags
     contact_info = models.CharField(max_length=200, blank=True)  # WhatsApp, Telegram, etc.
     views = models.IntegerField(default=0)
     downloads = models.IntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)  # Maintained from Review writes
+    review_count = models.PositiveIntegerField(default=0)
     is_free = models.BooleanField(default=True)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -98,8 +110,18 @@ class Note(models.Model):
     def __str__(self):
         return f"{self.title} - {self.seller.phone}"
     
+    @property
+    def avg_rating(self):
+        if not self.review_count:
+            return 0.00
+        return round(self.rating_sum / self.review_count, 2)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over approved notes
+            models.Index(fields=['is_approved', '-created_at', '-id'], name='note_approved_created_idx'),
+        ]
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -151,3 +173,98 @@ class Wishlist(models.Model):
     class Meta:
         unique_together = ['user', 'note']
         ordering = ['-created_at']
+
+class SearchDocument(models.Model):
+    note = models.OneToOneField(Note, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    length = models.PositiveIntegerField(default=0)  # Weighted token count, used for BM25 length normalisation
+    indexed_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Search document for {self.note_id}"
+
+class SearchPosting(models.Model):
+    term = models.CharField(max_length=64, db_index=True)
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name='search_postings')
+    frequency = models.PositiveIntegerField(default=1)  # Field-weighted term frequency
+    
+    def __str__(self):
+        return f"{self.term} -> {self.note_id}"
+    
+    class Meta:
+        unique_together = ['term', 'note']
+
+class SellerStats(models.Model):
+    user = models.OneToOneField('Account', on_delete=models.CASCADE, primary_key=True, related_name='seller_stats')
+    total_notes = models.IntegerField(default=0)
+    total_views = models.BigIntegerField(default=0)
+    wishlist_count = models.IntegerField(default=0)  # Notes this user saved
+    rating_sum = models.IntegerField(default=0)  # Reviews received as a seller
+    rating_count = models.IntegerField(default=0)
+    total_sales = models.IntegerField(default=0)  # Completed orders as seller
+    total_purchases = models.IntegerField(default=0)  # Completed orders as buyer
+    notes_by_day = models.JSONField(default=dict, blank=True)  # {'YYYY-MM-DD': count}, recent days only
+    notes_by_subject = models.JSONField(default=dict, blank=True)  # {subject_id: count}
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Stats for {self.user_id}"
+    
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return 0.00
+        return round(self.rating_sum / self.rating_count, 2)
+
+class Leaderboard(models.Model):
+    KIND_CHOICES = [
+        ('top_rated', 'Top Rated'),
+        ('most_viewed', 'Most Viewed'),
+        ('trending', 'Trending'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    scope = models.CharField(max_length=30, blank=True)  # '', 'subject:<id>' or 'semester:<n>'
+    note_ids = models.JSONField(default=list)  # Ranked, best first
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.kind} {self.scope or 'all'}"
+    
+    class Meta:
+        unique_together = ['kind', 'scope']
+
+class RelatedNotes(models.Model):
+    note = models.OneToOneField(Note, on_delete=models.CASCADE, primary_key=True, related_name='related_notes')
+    neighbors = models.JSONField(default=list)  # [[note id, score], ...], most similar first
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Related to {self.note_id}"
+    
+    class Meta:
+        verbose_name_plural = 'related notes'
+
+class RequestProfile(models.Model):
+    TRIGGER_CHOICES = [
+        ('staff', 'Staff user'),
+        ('signed', 'Signed header'),
+    ]
+    
+    user = models.ForeignKey('Account', on_delete=models.SET_NULL, null=True, blank=True, related_name='request_profiles')
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField(default=0)
+    duration_ms = models.FloatField(default=0)
+    query_count = models.PositiveIntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    profile = models.TextField(blank=True)  # cProfile stats, sorted by cumulative time
+    queries = models.JSONField(default=list, blank=True)  # [{'start_ms', 'duration_ms', 'sql'}] in execution order
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+    
+    class Meta:
+        ordering = ['-created_at']
@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) pagination and cached totals for note listings.
+
+Cursor pages are keyed on (created_at, id), so fetching page 500 costs the
+same index range scan as page 1. Cursors are opaque to clients.
+"""
+import base64
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 50
+COUNT_CACHE_TIMEOUT = 60
+
+# Query parameters that select a page or response extras rather than a result set
+PAGE_PARAMS = ('page', 'page_size', 'cursor', 'pagination', 'facets', 'fields', 'exclude', 'stream')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def wants_cursor(request):
+    return 'cursor' in request.GET or request.GET.get('pagination') == 'cursor'
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE):
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(note, reverse=False):
+    # A Note or a values() row
+    if isinstance(note, dict):
+        created_at, pk = note['created_at'], note['id']
+    else:
+        created_at, pk = note.created_at, note.pk
+    payload = {'c': created_at.isoformat(), 'i': str(pk), 'r': reverse}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """
+    Return (created_at, id, reverse) for a cursor produced by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        payload = json.loads(raw)
+        created_at = parse_datetime(payload['c'])
+        if created_at is None or timezone.is_naive(created_at):
+            raise ValueError(payload['c'])
+        if not isinstance(payload['i'], str):
+            raise TypeError(payload['i'])
+        return created_at, uuid.UUID(payload['i']), bool(payload.get('r'))
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {value}') from e
+
+
+def filter_params(request):
+    """
+    Normalized (sorted, non-empty) filter parameters of a listing request
+    """
+    return sorted(
+        (key, value)
+        for key in request.GET
+        if key not in PAGE_PARAMS
+        for value in request.GET.getlist(key)
+        if value != ''
+    )
+
+
+def cached_count(queryset, namespace, params):
+    """
+    Count a result set, reusing the total for identical filters for a short while
+    """
+    digest = hashlib.md5(json.dumps(params).encode()).hexdigest()
+    key = f'{namespace}:count:{digest}'
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, COUNT_CACHE_TIMEOUT)
+    return total
+
+
+def _page_url(request, cursor):
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    params.pop('page', None)
+    params.pop('pagination', None)
+    return f'{request.path}?{params.urlencode()}'
+
+
+def paginate_by_cursor(queryset, request, namespace, page_size=None):
+    """
+    Slice a Note queryset (or its values()) by cursor. Returns (page items, pagination info).
+    """
+    total = cached_count(queryset.order_by(), namespace, filter_params(request))
+    items, page_info = cursor_page(queryset, request, page_size)
+    return items, {'count': total, **page_info}
+
+
+def cursor_page(queryset, request, page_size=None):
+    """
+    The page of paginate_by_cursor without the total count
+    """
+    if page_size is None:
+        page_size = get_page_size(request)
+
+    cursor = request.GET.get('cursor', '')
+    reverse = False
+    if cursor:
+        created_at, pk, reverse = decode_cursor(cursor)
+        if reverse:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+    if reverse:
+        queryset = queryset.order_by('created_at', 'id')
+    else:
+        queryset = queryset.order_by('-created_at', '-id')
+
+    items = list(queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if reverse:
+        items.reverse()
+
+    next_cursor = previous_cursor = None
+    if items:
+        if has_more or reverse:
+            next_cursor = encode_cursor(items[-1])
+        if cursor and (has_more or not reverse):
+            previous_cursor = encode_cursor(items[0], reverse=True)
+
+    return items, {
+        'next': _page_url(request, next_cursor) if next_cursor else None,
+        'previous': _page_url(request, previous_cursor) if previous_cursor else None,
+        'next_cursor': next_cursor,
+        'previous_cursor': previous_cursor,
+    }
@@ -0,0 +1,195 @@
+"""
+On-demand profiling of single API requests.
+
+A request carrying an ``X-Profile`` header is run under cProfile with a SQL
+timeline captured through sqltrace (including queries on worker threads; the
+cProfile output covers the request's own thread only), and the result is
+stored as a RequestProfile browsable in the admin. The header must be either
+``1`` from a staff user (session or JWT) or a signed token from make_token()
+(``manage.py profile_token``), so profiling can be requested from a client
+that isn't logged in as staff. Requests without the header pay one dict lookup.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import sqltrace
+from .authentication import CachedJWTAuthentication
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_X_PROFILE'
+RESPONSE_HEADER = 'X-Profile-Id'
+SIGNING_SALT = 'marketplace.profiling'
+TOKEN_VALUE = 'profile'
+DEFAULT_TOKEN_MAX_AGE = 3600
+PROFILE_LINES = 60  # Functions kept from the cProfile output
+MAX_QUERIES = 1000  # SQL statements kept per profile
+MAX_SQL_LENGTH = 2000
+DEFAULT_MAX_RECORDS = 500
+
+
+def make_token():
+    """
+    A signed X-Profile header value, valid for PROFILING_TOKEN_MAX_AGE seconds
+    """
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(TOKEN_VALUE)
+
+
+def _valid_token(value):
+    max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', DEFAULT_TOKEN_MAX_AGE)
+    try:
+        return signing.TimestampSigner(salt=SIGNING_SALT).unsign(value, max_age=max_age) == TOKEN_VALUE
+    except signing.BadSignature:
+        return False
+
+
+def _staff_user(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result and result[0].is_staff:
+        return result[0]
+    return None
+
+
+def get_trigger(request):
+    """
+    Return (trigger, user) when this request should be profiled, else None
+    """
+    value = request.META.get(HEADER)
+    if not value:
+        return None
+    if value != '1' and _valid_token(value):
+        user = getattr(request, 'user', None)
+        return 'signed', user if user is not None and user.is_authenticated else None
+    if value == '1':
+        user = _staff_user(request)
+        if user is not None:
+            return 'staff', user
+    return None
+
+
+class SQLTimeline:
+    """
+    sqltrace observer recording each query's start offset and duration
+    """
+    def __init__(self, started):
+        self.started = started
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def record(self, sql, started, duration):
+        with self._lock:
+            self.count += 1
+            self.seconds += duration
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    'start_ms': round((started - self.started) * 1000, 3),
+                    'duration_ms': round(duration * 1000, 3),
+                    'sql': sql[:MAX_SQL_LENGTH],
+                })
+
+
+def format_stats(profiler, lines=PROFILE_LINES):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(lines)
+    return stream.getvalue()
+
+
+def save(request, response, trigger, user, duration, timeline, profiler):
+    match = getattr(request, 'resolver_match', None)
+    profile = RequestProfile.objects.create(
+        user=user,
+        trigger=trigger,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=match.view_name if match else '',
+        status_code=response.status_code,
+        duration_ms=round(duration * 1000, 3),
+        query_count=timeline.count,
+        query_ms=round(timeline.seconds * 1000, 3),
+        profile=format_stats(profiler),
+        queries=timeline.queries,
+    )
+    max_records = getattr(settings, 'PROFILING_MAX_RECORDS', DEFAULT_MAX_RECORDS)
+    stale = list(RequestProfile.objects.values_list('pk', flat=True)[max_records:])
+    if stale:
+        RequestProfile.objects.filter(pk__in=stale).delete()
+    return profile
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trigger = get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        return self.profile(request, *trigger)
+
+    async def __acall__(self, request):
+        if not request.META.get(HEADER):
+            return await self.get_response(request)
+        trigger = await sync_to_async(get_trigger)(request)
+        if trigger is None:
+            return await self.get_response(request)
+        return await self.aprofile(request, *trigger)
+
+    def profile(self, request, trigger, user):
+        started = time.perf_counter()
+        profiler = cProfile.Profile()
+        with sqltrace.observe(SQLTimeline(started)) as timeline:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        return self.store(request, response, trigger, user, time.perf_counter() - started, timeline, profiler)
+
+    async def aprofile(self, request, trigger, user):
+        started = time.perf_counter()
+        profiler = cProfile.Profile()
+        with sqltrace.observe(SQLTimeline(started)) as timeline:
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+        return await sync_to_async(self.store)(
+            request, response, trigger, user, time.perf_counter() - started, timeline, profiler
+        )
+
+    def store(self, request, response, trigger, user, duration, timeline, profiler):
+        try:
+            profile = save(request, response, trigger, user, duration, timeline, profiler)
+        except Exception:
+            # Never fail the profiled request because the profile couldn't be stored
+            logger.exception('Failed to store request profile')
+        else:
+            response[RESPONSE_HEADER] = str(profile.pk)
+        return response
@@ -0,0 +1,150 @@
+"""
+values()-based serialization for read-only Note lists.
+
+Once the queries are fixed, list endpoints spend most of their CPU in
+NoteSerializer: one serializer per row and a dispatch through every field.
+These functions read the same data with a single values() query (seller and
+subject columns joined in) and build each row as a plain dict. Columns DRF
+would transform (UUIDs, decimals, datetimes) are converted with the very
+field instances NoteSerializer uses, so the rendered JSON is identical.
+``manage.py serializer_benchmark`` checks that equivalence and times both paths.
+"""
+import copy
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from .models import Note
+from .serializers import NoteSerializer, WishlistSerializer
+
+FIELDS = list(NoteSerializer.Meta.fields)
+
+# values() lookup behind each serializer field that isn't a plain column
+SOURCES = {
+    'seller_name': 'seller__name',
+    'seller_phone': 'seller__phone',
+    'subject_name': 'subject__name',
+    'subject_code': 'subject__code',
+}
+
+# DRF returns these column values unchanged
+PASSTHROUGH = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+AVG_RATING = 'avg_rating'
+IN_WISHLIST = 'in_wishlist'
+
+
+@lru_cache(maxsize=None)
+def _serializer_fields(serializer_class):
+    return serializer_class().fields
+
+
+def _converter(field):
+    if field is None or type(field) in PASSTHROUGH:
+        return None
+    if isinstance(field, serializers.DateTimeField) and not hasattr(field, 'timezone'):
+        # Look up the active timezone once per call rather than per value
+        field = copy.copy(field)
+        field.timezone = field.default_timezone()
+    return field.to_representation
+
+
+def note_columns(fields=None, prefix=''):
+    """
+    values() columns needed for the selected NoteSerializer fields. The cursor
+    pagination keys are always included; serialize_notes() only emits ``fields``.
+    """
+    columns = [prefix + 'id', prefix + 'created_at']
+    for name in fields or FIELDS:
+        if name == AVG_RATING:
+            sources = ['rating_sum', 'review_count']
+        elif name == IN_WISHLIST:
+            sources = []
+        else:
+            sources = [SOURCES.get(name, name)]
+        for source in sources:
+            if prefix + source not in columns:
+                columns.append(prefix + source)
+    return columns
+
+
+def note_values(queryset, fields=None):
+    """
+    A Note queryset as values() rows for serialize_notes()
+    """
+    return queryset.values(*note_columns(fields))
+
+
+def ordered_note_values(note_ids, fields=None):
+    """
+    note_values() rows for the approved notes among note_ids, in that order
+    """
+    rows = note_values(Note.objects.filter(pk__in=note_ids, is_approved=True), fields)
+    by_id = {str(row['id']): row for row in rows}
+    return [by_id[str(pk)] for pk in note_ids if str(pk) in by_id]
+
+
+@lru_cache(maxsize=256)
+def _note_plan(fields, prefix):
+    serializer_fields = _serializer_fields(NoteSerializer)
+    plan = []
+    for name in fields:
+        if name == AVG_RATING:
+            plan.append((name, name, serializer_fields[name]))
+        elif name == IN_WISHLIST:
+            plan.append((name, name, None))
+        else:
+            plan.append((name, prefix + SOURCES.get(name, name), serializer_fields[name]))
+    return plan
+
+
+def _note_builder(fields, prefix, wishlist_ids):
+    plan = [
+        (name, column, _converter(field))
+        for name, column, field in _note_plan(tuple(fields or FIELDS), prefix)
+    ]
+    id_column = prefix + 'id'
+    rating_sum = prefix + 'rating_sum'
+    review_count = prefix + 'review_count'
+
+    def build(row):
+        data = {}
+        for name, column, convert in plan:
+            if column == AVG_RATING:
+                # Same arithmetic as Note.avg_rating
+                count = row[review_count]
+                value = round(row[rating_sum] / count, 2) if count else 0.00
+            elif column == IN_WISHLIST:
+                value = row[id_column] in wishlist_ids
+            else:
+                value = row[column]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+    return build
+
+
+def serialize_notes(rows, fields=None, wishlist_ids=frozenset()):
+    """
+    NoteSerializer(many=True).data for rows from note_values()
+    """
+    build = _note_builder(fields, '', wishlist_ids)
+    return [build(row) for row in rows]
+
+
+def wishlist_values(queryset):
+    """
+    A Wishlist queryset as values() rows for serialize_wishlist()
+    """
+    return queryset.values('id', 'created_at', *note_columns(prefix='note__'))
+
+
+def serialize_wishlist(rows, wishlist_ids=frozenset()):
+    """
+    WishlistSerializer(many=True).data for rows from wishlist_values()
+    """
+    build_note = _note_builder(None, 'note__', wishlist_ids)
+    created_at = _converter(_serializer_fields(WishlistSerializer)['created_at'])
+    return [
+        {'id': row['id'], 'note': build_note(row), 'created_at': created_at(row['created_at'])}
+        for row in rows
+    ]
@@ -0,0 +1,73 @@
+"""
+Denormalized rating aggregates on Note.
+
+Note.rating_sum and Note.review_count are adjusted with F() expressions on
+every Review write, so reads never aggregate over the reviews table.
+reconcile() repairs any drift (e.g. from raw SQL or queryset.update()).
+"""
+from django.db.models import F, OuterRef, Subquery, Count, Sum, IntegerField
+from django.db.models.functions import Coalesce
+
+from .models import Note, Review
+
+
+def apply_delta(note_id, rating_delta, count_delta):
+    """
+    Atomically shift the stored aggregates of one note
+    """
+    if not rating_delta and not count_delta:
+        return
+    Note.objects.filter(pk=note_id).update(
+        rating_sum=F('rating_sum') + rating_delta,
+        review_count=F('review_count') + count_delta,
+    )
+
+
+def annotate_actual(queryset):
+    """
+    Annotate notes with aggregates computed from the reviews table
+    """
+    reviews = Review.objects.filter(note=OuterRef('pk')).order_by().values('note')
+    return queryset.annotate(
+        actual_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'), output_field=IntegerField()), 0
+        ),
+        actual_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total'), output_field=IntegerField()), 0
+        ),
+    )
+
+
+def recompute(note_id):
+    """
+    Reset one note's aggregates from the reviews table
+    """
+    totals = Review.objects.filter(note_id=note_id).aggregate(count=Count('pk'), rating=Sum('rating'))
+    Note.objects.filter(pk=note_id).update(
+        review_count=totals['count'] or 0,
+        rating_sum=totals['rating'] or 0,
+    )
+
+
+def reconcile(batch_size=1000):
+    """
+    Recompute aggregates for notes whose stored values drifted. Returns the number of fixed notes.
+    """
+    drifted = annotate_actual(Note.objects.all()).exclude(
+        review_count=F('actual_count'), rating_sum=F('actual_sum')
+    ).only('pk', 'rating_sum', 'review_count')
+
+    fixed = 0
+    batch = []
+    for note in drifted.iterator(chunk_size=batch_size):
+        note.review_count = note.actual_count
+        note.rating_sum = note.actual_sum
+        batch.append(note)
+        if len(batch) >= batch_size:
+            Note.objects.bulk_update(batch, ['review_count', 'rating_sum'])
+            fixed += len(batch)
+            batch = []
+    if batch:
+        Note.objects.bulk_update(batch, ['review_count', 'rating_sum'])
+        fixed += len(batch)
+    return fixed
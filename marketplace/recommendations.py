@@ -0,0 +1,187 @@
+"""
+Item-to-item "students also saved" recommendations.
+
+build() is an offline batch job (``manage.py build_recommendations``). A
+student's basket is the notes they wishlisted plus the notes they reviewed
+favourably. Two notes are related when the same students saved both: the
+co-occurrence count is normalised by each note's popularity (cosine or
+Jaccard) and every note keeps its top-K neighbours in a RelatedNotes row,
+which the related-notes endpoint reads with one query.
+
+Interactions are streamed from the database in student order into a sparse
+student x note matrix X (SciPy CSR), with each basket capped at max_items
+notes so one very active account can't dominate. Co-occurrence counts are
+the sparse product X.T @ X, computed for a block of notes at a time; blocks
+are sized from each note's exact upper bound of product entries, so a block
+holds at most max_pairs counts. Scoring and top-K selection are vectorized
+per block.
+"""
+import heapq
+import itertools
+from array import array
+
+import numpy as np
+from django.utils import timezone
+from scipy import sparse
+
+from . import leaderboards, projection
+from .models import Note, RelatedNotes, Review, Wishlist
+
+TOP_K = 20
+MIN_SUPPORT = 1  # Students two notes must share to be related
+MAX_ITEMS_PER_USER = 200
+MAX_PAIRS_PER_PASS = 2000000
+CHUNK_SIZE = 5000
+WRITE_BATCH_SIZE = 500
+MIN_REVIEW_RATING = 4
+SIMILARITIES = ['cosine', 'jaccard']
+
+
+def _interactions(chunk_size):
+    """
+    (user id, note id) rows from wishlists and favourable reviews, ordered by user
+    """
+    wishlisted = (
+        Wishlist.objects.order_by('user_id').values_list('user_id', 'note_id')
+        .iterator(chunk_size=chunk_size)
+    )
+    reviewed = (
+        Review.objects.filter(rating__gte=MIN_REVIEW_RATING).order_by('reviewer_id')
+        .values_list('reviewer_id', 'note_id').iterator(chunk_size=chunk_size)
+    )
+    return heapq.merge(wishlisted, reviewed, key=lambda row: row[0])
+
+
+def _baskets(note_index, chunk_size, max_items):
+    """
+    Each student's saved notes as a list of note indexes
+    """
+    for user_id, rows in itertools.groupby(_interactions(chunk_size), key=lambda row: row[0]):
+        items = sorted({note_index[note_id] for _, note_id in rows if note_id in note_index})
+        if items:
+            yield items[:max_items]
+
+
+def _similarity(kind):
+    # Vectorized over arrays of shared counts and the two notes' popularity
+    if kind == 'cosine':
+        return lambda shared, count_a, count_b: shared / np.sqrt(count_a * count_b)
+    if kind == 'jaccard':
+        return lambda shared, count_a, count_b: shared / (count_a + count_b - shared)
+    raise ValueError(f"Unknown similarity: {kind}. Choose from {', '.join(SIMILARITIES)}")
+
+
+def _blocks(bounds, limit):
+    """
+    Contiguous (start, end) note ranges whose summed bounds stay within limit (at least one note each)
+    """
+    start = total = 0
+    for index, bound in enumerate(bounds.tolist()):
+        if index > start and total + bound > limit:
+            yield start, index
+            start, total = index, 0
+        total += bound
+    if start < len(bounds):
+        yield start, len(bounds)
+
+
+def _write(rows):
+    RelatedNotes.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['note'], update_fields=['neighbors', 'computed_at']
+    )
+
+
+def build(similarity='cosine', top_k=TOP_K, min_support=MIN_SUPPORT, max_items=MAX_ITEMS_PER_USER,
+          max_pairs=MAX_PAIRS_PER_PASS, chunk_size=CHUNK_SIZE):
+    """
+    Recompute every approved note's related notes. Returns a summary dict.
+    """
+    score = _similarity(similarity)
+    started = timezone.now()
+
+    # Approved notes get small integer indexes: the matrix columns
+    note_ids = list(Note.objects.filter(is_approved=True).values_list('pk', flat=True).iterator(chunk_size=chunk_size))
+    note_index = {pk: index for index, pk in enumerate(note_ids)}
+    note_keys = [str(pk) for pk in note_ids]
+
+    # Student x note incidence matrix
+    rows, columns = array('i'), array('i')
+    students = 0
+    for items in _baskets(note_index, chunk_size, max_items):
+        rows.extend([students] * len(items))
+        columns.extend(items)
+        students += 1
+    rows, columns = np.frombuffer(rows, dtype=np.intc), np.frombuffer(columns, dtype=np.intc)
+    saved = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.int32), (rows, columns)), shape=(students, len(note_ids))
+    )
+    by_note = saved.T.tocsr()
+    popularity = np.asarray(saved.sum(axis=0)).ravel()
+
+    # Row i of X.T @ X has at most sum(basket sizes of the students who saved note i) entries
+    bounds = by_note @ np.diff(saved.indptr)
+    total_pairs = int(bounds.sum() - popularity.sum())
+
+    written = partitions = 0
+    for start, end in _blocks(bounds, max_pairs):
+        partitions += 1
+        shared = (by_note[start:end] @ saved).tocsr()
+        items = np.repeat(np.arange(start, end), np.diff(shared.indptr))
+        others, counts = shared.indices, shared.data
+        keep = (others != items) & (counts >= min_support)
+        items, others, counts = items[keep], others[keep], counts[keep]
+        scores = np.round(score(counts, popularity[items], popularity[others]), 4)
+        offsets = np.searchsorted(items, np.arange(start, end + 1))
+
+        batch = []
+        for item in range(start, end):
+            low, high = offsets[item - start], offsets[item - start + 1]
+            if low == high:
+                continue
+            # Best score first, ties by note index
+            order = np.lexsort((others[low:high], -scores[low:high]))[:top_k]
+            batch.append(RelatedNotes(
+                note_id=note_ids[item],
+                neighbors=[
+                    [note_keys[other], value]
+                    for other, value in zip(others[low:high][order].tolist(), scores[low:high][order].tolist())
+                ],
+                computed_at=started,
+            ))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                _write(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            _write(batch)
+            written += len(batch)
+
+    # Notes that no longer have neighbours
+    stale, _ = RelatedNotes.objects.filter(computed_at__lt=started).delete()
+
+    return {
+        'notes': written,
+        'removed': stale,
+        'students': students,
+        'pairs': total_pairs,
+        'partitions': partitions,
+    }
+
+
+def related_note_ids(note_id, subject_id, limit=10):
+    """
+    Ids of the notes most often saved with this one, or the subject's top
+    rated notes when it has no neighbours yet
+    """
+    neighbors = RelatedNotes.objects.filter(pk=note_id).values_list('neighbors', flat=True).first()
+    if neighbors:
+        return [pk for pk, value in neighbors][:limit]
+    scope = leaderboards.make_scope(subject=subject_id)
+    return [pk for pk in leaderboards.ranked_ids('top_rated', scope) if pk != str(note_id)][:limit]
+
+
+def related_note_rows(note_id, subject_id, limit=10):
+    """
+    related_note_ids() as projection.note_values() rows
+    """
+    return projection.ordered_note_values(related_note_ids(note_id, subject_id, limit))
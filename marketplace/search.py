@@ -0,0 +1,338 @@
+"""
+Inverted-index full-text search for approved notes.
+
+Every approved note is tokenized into SearchPosting rows (one row per term per
+note, carrying a field-weighted term frequency) plus a SearchDocument row with
+the weighted document length. Queries only touch the postings of their own
+terms and results are ranked with BM25. Scoring runs in the database, so a
+search only transfers the ids of its best SEARCH_MAX_RESULTS matches.
+"""
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, When, F, Value, FloatField, IntegerField, Count, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Note, SearchDocument, SearchPosting
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'into', 'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with',
+])
+
+# Matches in the title count more than matches in the description
+FIELD_WEIGHTS = {
+    'title': 3,
+    'subject': 2,
+    'tags': 2,
+    'description': 1,
+}
+
+# Saves that only touch other columns (views, downloads...) skip reindexing
+INDEXED_FIELDS = frozenset(['title', 'description', 'tags', 'subject', 'is_approved'])
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_TERM_LENGTH = 64
+
+# The last query term also matches longer terms once it has MIN_PREFIX_LENGTH
+# characters. Every completion counts as a match, but only the
+# MAX_PREFIX_EXPANSIONS most frequent ones contribute to the relevance score.
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 20
+
+# Corpus stats, document frequencies and prefix completions may lag the index by this long
+STATS_CACHE_KEY = 'search:corpus_stats'
+DF_CACHE_PREFIX = 'search:df:'
+PREFIX_CACHE_PREFIX = 'search:prefix:'
+STATS_CACHE_TIMEOUT = 60
+
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms, dropping stop words
+    """
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def document_terms(note):
+    """
+    Build the field-weighted term frequencies for a note
+    """
+    fields = {
+        'title': note.title,
+        'subject': f'{note.subject.name} {note.subject.code}',
+        'tags': note.tags,
+        'description': note.description,
+    }
+    frequencies = Counter()
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            frequencies[token] += weight
+    return frequencies
+
+
+def _build_rows(note):
+    frequencies = document_terms(note)
+    document = SearchDocument(note=note, length=sum(frequencies.values()))
+    postings = [
+        SearchPosting(term=term, note=note, frequency=frequency)
+        for term, frequency in frequencies.items()
+    ]
+    return document, postings
+
+
+def index_note(note):
+    """
+    Add, refresh or drop a single note in the index
+    """
+    if not note.is_approved:
+        remove_note(note.pk)
+        return
+
+    document, postings = _build_rows(note)
+    with transaction.atomic():
+        SearchPosting.objects.filter(note_id=note.pk).delete()
+        SearchPosting.objects.bulk_create(postings)
+        SearchDocument.objects.update_or_create(note_id=note.pk, defaults={'length': document.length})
+    invalidate_stats()
+
+
+def index_new_notes(notes):
+    """
+    Index freshly bulk-created notes (which never went through post_save)
+    """
+    documents, postings = [], []
+    for note in notes:
+        if note.is_approved:
+            document, note_postings = _build_rows(note)
+            documents.append(document)
+            postings.extend(note_postings)
+    SearchDocument.objects.bulk_create(documents)
+    SearchPosting.objects.bulk_create(postings, batch_size=5000)
+    invalidate_stats()
+
+
+def remove_note(note_id):
+    """
+    Drop a note from the index
+    """
+    with transaction.atomic():
+        SearchPosting.objects.filter(note_id=note_id).delete()
+        SearchDocument.objects.filter(note_id=note_id).delete()
+    invalidate_stats()
+
+
+def reindex_notes(queryset):
+    """
+    Refresh every note in a queryset, e.g. after a bulk approval or a subject rename
+    """
+    for note in queryset.select_related('subject').iterator(chunk_size=500):
+        index_note(note)
+
+
+def rebuild_index(batch_size=500):
+    """
+    Drop and rebuild the whole index. Returns the number of indexed notes.
+    """
+    with transaction.atomic():
+        SearchPosting.objects.all().delete()
+        SearchDocument.objects.all().delete()
+
+    notes = Note.objects.filter(is_approved=True).select_related('subject').order_by('pk')
+    indexed = 0
+    documents, postings = [], []
+
+    def flush():
+        with transaction.atomic():
+            SearchDocument.objects.bulk_create(documents)
+            SearchPosting.objects.bulk_create(postings, batch_size=batch_size * 10)
+        documents.clear()
+        postings.clear()
+
+    for note in notes.iterator(chunk_size=batch_size):
+        document, note_postings = _build_rows(note)
+        documents.append(document)
+        postings.extend(note_postings)
+        indexed += 1
+        if len(documents) >= batch_size:
+            flush()
+    if documents:
+        flush()
+
+    invalidate_stats()
+    return indexed
+
+
+def invalidate_stats():
+    cache.delete(STATS_CACHE_KEY)
+
+
+def corpus_stats():
+    """
+    Return (document count, average document length), cached briefly
+    """
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        totals = SearchDocument.objects.aggregate(count=Count('pk'), length=Sum('length'))
+        count = totals['count'] or 0
+        stats = (count, (totals['length'] or 0) / count if count else 0.0)
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def document_frequencies(terms):
+    """
+    Return {term: number of notes containing it}, cached briefly per term
+    """
+    keys = {term: DF_CACHE_PREFIX + term for term in terms}
+    cached = cache.get_many(list(keys.values()))
+    frequencies = {term: cached[key] for term, key in keys.items() if key in cached}
+    missing = [term for term in terms if term not in frequencies]
+    if missing:
+        counts = dict(
+            SearchPosting.objects.filter(term__in=missing).order_by()
+            .values('term').annotate(count=Count('pk')).values_list('term', 'count')
+        )
+        fresh = {term: counts.get(term, 0) for term in missing}
+        cache.set_many({keys[term]: count for term, count in fresh.items()}, STATS_CACHE_TIMEOUT)
+        frequencies.update(fresh)
+    return frequencies
+
+
+def _expand_prefix(prefix):
+    """
+    The MAX_PREFIX_EXPANSIONS most frequent index terms starting with prefix, with their document frequencies
+    """
+    key = PREFIX_CACHE_PREFIX + prefix
+    expansions = cache.get(key)
+    if expansions is None:
+        expansions = list(
+            SearchPosting.objects.filter(term__startswith=prefix).order_by()
+            .values('term').annotate(count=Count('pk'))
+            .order_by('-count', 'term').values_list('term', 'count')[:MAX_PREFIX_EXPANSIONS]
+        )
+        cache.set(key, expansions, STATS_CACHE_TIMEOUT)
+    return dict(expansions)
+
+
+def _query_terms(query):
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def _is_prefix(query_terms, index):
+    # The last term may still be being typed; one letter would match half the vocabulary
+    return index == len(query_terms) - 1 and len(query_terms[index]) >= MIN_PREFIX_LENGTH
+
+
+def _expand(query_terms):
+    """
+    Map each query term to the index terms scored for it, with their
+    document frequencies. A prefix scores only its most frequent completions.
+    """
+    frequencies = document_frequencies(query_terms)
+    expansions = {term: {term: frequencies[term]} for term in query_terms}
+    for index, term in enumerate(query_terms):
+        if _is_prefix(query_terms, index):
+            expansions[term].update(_expand_prefix(term))
+    return expansions
+
+
+def _rank(expansions, matches, limit=None):
+    """
+    Score ``matches`` (notes already matching every query term) with BM25 in
+    the database and return the best ``limit`` ids
+    """
+    document_count, average_length = corpus_stats()
+    if not document_count or not average_length:
+        return []
+
+    weights = {}
+    for frequencies in expansions.values():
+        for term, document_frequency in frequencies.items():
+            if document_frequency:
+                idf = math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                weights[term] = weights.get(term, 0.0) + idf
+    if not weights:
+        return []
+
+    frequency = F('frequency')
+    length = Coalesce('note__search_document__length', 0)
+    score = (
+        Case(*[When(term=term, then=Value(idf)) for term, idf in weights.items()], output_field=FloatField())
+        * frequency * Value(BM25_K1 + 1)
+        / (frequency + Value(BM25_K1 * (1 - BM25_B)) + Value(BM25_K1 * BM25_B / average_length) * length)
+    )
+    ranked = (
+        SearchPosting.objects.filter(term__in=list(weights), note_id__in=matches.order_by().values('pk'))
+        .values('note_id').annotate(score=Sum(score))
+        .order_by('-score', 'note_id').values_list('note_id', flat=True)
+    )
+    return list(ranked if limit is None else ranked[:limit])
+
+
+def rank(query, candidates=None, limit=None):
+    """
+    Return note ids matching every query term, best BM25 score first.
+
+    ``candidates`` (a Note queryset) restricts which notes are ranked; idf
+    stays corpus-wide, so a note scores the same with or without filters.
+    """
+    query_terms = _query_terms(query)
+    if not query_terms:
+        return []
+    if candidates is None:
+        candidates = Note.objects.filter(is_approved=True)
+    return _rank(_expand(query_terms), filter_matches(candidates, query), limit)
+
+
+def filter_matches(queryset, query):
+    """
+    Restrict a Note queryset to notes matching every query term, without
+    ordering. A query made only of stop words leaves it unfiltered.
+    """
+    query_terms = _query_terms(query)
+    for index, term in enumerate(query_terms):
+        if _is_prefix(query_terms, index):
+            postings = SearchPosting.objects.filter(term__startswith=term)
+        else:
+            postings = SearchPosting.objects.filter(term=term)
+        queryset = queryset.filter(pk__in=postings.values('note_id'))
+    return queryset
+
+
+def apply_search(queryset, query):
+    """
+    Restrict a Note queryset to search matches, ordered by relevance.
+
+    Apply it after the other filters: every match is kept, so counts and
+    pages are exact. The best SEARCH_MAX_RESULTS matches are ordered by
+    BM25 score and any others follow, newest first.
+    """
+    query_terms = _query_terms(query)
+    if not query_terms:
+        return queryset
+    matches = filter_matches(queryset, query)
+    ranked = _rank(_expand(query_terms), matches, getattr(settings, 'SEARCH_MAX_RESULTS', 500))
+    if not ranked:
+        return matches.order_by('-created_at', '-id')
+    ordering = Case(
+        *[When(pk=note_id, then=position) for position, note_id in enumerate(ranked)],
+        default=len(ranked),
+        output_field=IntegerField()
+    )
+    return matches.annotate(search_rank=ordering).order_by('search_rank', '-created_at', '-id')
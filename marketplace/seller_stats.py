@@ -0,0 +1,209 @@
+"""
+Materialized per-user statistics for the dashboard and analytics.
+
+SellerStats rows are adjusted from Note, Wishlist, Review and Order writes
+(see signals.py) so dashboard_stats and analytics read a single row by
+primary key. A missing row is rebuilt from the source tables on first use,
+and rebuild_all() recomputes everything in bounded batches.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import caching
+from .models import Account, Note, Order, Review, SellerStats, UserProfile, Wishlist
+
+# Days kept in SellerStats.notes_by_day; analytics reports the last 30
+RECENT_DAYS = 30
+POPULAR_SUBJECTS = 5
+
+# Fields mirrored onto UserProfile
+PROFILE_FIELDS = ('rating_sum', 'rating_count', 'total_sales', 'total_purchases')
+
+
+def _day_key(value):
+    return timezone.localdate(value).isoformat()
+
+
+def _cutoff():
+    return (timezone.localdate() - timedelta(days=RECENT_DAYS)).isoformat()
+
+
+def _shift(counts, key, delta):
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def compute(user_ids):
+    """
+    Compute stats for a batch of users from the source tables, with grouped queries
+    """
+    values = {
+        user_id: {
+            'total_notes': 0, 'total_views': 0, 'wishlist_count': 0,
+            'rating_sum': 0, 'rating_count': 0, 'total_sales': 0, 'total_purchases': 0,
+            'notes_by_day': {}, 'notes_by_subject': {},
+        }
+        for user_id in user_ids
+    }
+    notes = Note.objects.filter(seller_id__in=user_ids).order_by()
+
+    for row in notes.values('seller_id').annotate(count=Count('pk'), views=Sum('views')):
+        values[row['seller_id']]['total_notes'] = row['count']
+        values[row['seller_id']]['total_views'] = row['views'] or 0
+
+    for row in notes.values('seller_id', 'subject_id').annotate(count=Count('pk')):
+        values[row['seller_id']]['notes_by_subject'][str(row['subject_id'])] = row['count']
+
+    since = timezone.now() - timedelta(days=RECENT_DAYS + 1)
+    recent = notes.filter(created_at__gte=since).annotate(day=TruncDate('created_at'))
+    for row in recent.values('seller_id', 'day').annotate(count=Count('pk')):
+        values[row['seller_id']]['notes_by_day'][row['day'].isoformat()] = row['count']
+
+    wishlist = Wishlist.objects.filter(user_id__in=user_ids).order_by()
+    for row in wishlist.values('user_id').annotate(count=Count('pk')):
+        values[row['user_id']]['wishlist_count'] = row['count']
+
+    reviews = Review.objects.filter(seller_id__in=user_ids).order_by()
+    for row in reviews.values('seller_id').annotate(count=Count('pk'), total=Sum('rating')):
+        values[row['seller_id']]['rating_count'] = row['count']
+        values[row['seller_id']]['rating_sum'] = row['total'] or 0
+
+    completed = Order.objects.filter(status='completed').order_by()
+    for row in completed.filter(seller_id__in=user_ids).values('seller_id').annotate(count=Count('pk')):
+        values[row['seller_id']]['total_sales'] = row['count']
+    for row in completed.filter(buyer_id__in=user_ids).values('buyer_id').annotate(count=Count('pk')):
+        values[row['buyer_id']]['total_purchases'] = row['count']
+
+    return values
+
+
+def sync_profiles(stats_rows):
+    """
+    Copy rating and sales figures onto the matching UserProfile rows
+    """
+    by_user = {stats.pk: stats for stats in stats_rows}
+    profiles = list(UserProfile.objects.filter(user_id__in=list(by_user)))
+    for profile in profiles:
+        stats = by_user[profile.user_id]
+        profile.rating = stats.rating
+        profile.total_sales = stats.total_sales
+        profile.total_purchases = stats.total_purchases
+    if profiles:
+        UserProfile.objects.bulk_update(profiles, ['rating', 'total_sales', 'total_purchases'])
+
+
+def rebuild_for(user_id):
+    """
+    Recompute and store one user's stats
+    """
+    stats, _ = SellerStats.objects.update_or_create(pk=user_id, defaults=compute([user_id])[user_id])
+    sync_profiles([stats])
+    return stats
+
+
+def rebuild_all(batch_size=1000):
+    """
+    Recompute stats for every account. Returns the number of rows written.
+    """
+    written = 0
+    user_ids = Account.objects.order_by('pk').values_list('pk', flat=True)
+    batch = []
+
+    def flush():
+        rows = [SellerStats(pk=user_id, **fields) for user_id, fields in compute(batch).items()]
+        with transaction.atomic():
+            SellerStats.objects.filter(pk__in=batch).delete()
+            SellerStats.objects.bulk_create(rows)
+            sync_profiles(rows)
+        batch.clear()
+        return len(rows)
+
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            written += flush()
+    if batch:
+        written += flush()
+    return written
+
+
+def get_for_user(user):
+    stats = SellerStats.objects.filter(pk=user.pk).first()
+    if stats is None:
+        stats = rebuild_for(user.pk)
+    return stats
+
+
+def adjust(user_id, **deltas):
+    """
+    Shift counters of one user's stats with F() expressions
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not user_id or not deltas:
+        return
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if not SellerStats.objects.filter(pk=user_id).update(updated_at=timezone.now(), **updates):
+        # No row yet: the signal fires after the write, so a rebuild includes it
+        rebuild_for(user_id)
+        return
+    if any(field in PROFILE_FIELDS for field in deltas):
+        sync_profiles(SellerStats.objects.filter(pk=user_id))
+
+
+def adjust_notes(seller_id, delta, subject_id=None, created_at=None, views=0, old_subject_id=None):
+    """
+    Record notes being added (delta=1), removed (delta=-1) or moved between subjects (delta=0)
+    """
+    with transaction.atomic():
+        stats = SellerStats.objects.select_for_update().filter(pk=seller_id).first()
+        if stats is None:
+            rebuild_for(seller_id)
+            return
+
+        stats.total_notes += delta
+        stats.total_views += views
+        if old_subject_id is not None:
+            _shift(stats.notes_by_subject, str(old_subject_id), -1)
+            _shift(stats.notes_by_subject, str(subject_id), 1)
+        elif subject_id is not None:
+            _shift(stats.notes_by_subject, str(subject_id), delta)
+        if created_at is not None and delta:
+            day = _day_key(created_at)
+            if day >= _cutoff():
+                _shift(stats.notes_by_day, day, delta)
+        cutoff = _cutoff()
+        stats.notes_by_day = {day: count for day, count in stats.notes_by_day.items() if day >= cutoff}
+        stats.save()
+
+
+def add_views(counts_by_note):
+    """
+    Add flushed note view counts to the sellers' totals
+    """
+    by_seller = {}
+    notes = Note.objects.filter(pk__in=list(counts_by_note)).values_list('pk', 'seller_id')
+    for note_id, seller_id in notes:
+        by_seller[seller_id] = by_seller.get(seller_id, 0) + counts_by_note[note_id]
+    for seller_id, views in by_seller.items():
+        SellerStats.objects.filter(pk=seller_id).update(total_views=F('total_views') + views)
+
+
+def recent_notes(stats):
+    cutoff = _cutoff()
+    return sum(count for day, count in stats.notes_by_day.items() if day >= cutoff)
+
+
+def popular_subjects(stats, limit=POPULAR_SUBJECTS):
+    names = caching.subject_names()
+    ranked = sorted(stats.notes_by_subject.items(), key=lambda item: -item[1])[:limit]
+    return [
+        {'subject__name': names.get(subject_id), 'count': count}
+        for subject_id, count in ranked
+    ]
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Account, UserProfile, Subject, Note, Wishlist, Review, Order
+from . import wishlists
 
 class AccountSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,14 +25,24 @@ class UserProfileSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'rating', 'total_sales', 'total_purchases', 'created_at']
 
-class NoteSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Accepts an optional ``fields`` argument naming the fields to keep
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class NoteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     seller_name = serializers.CharField(source='seller.name', read_only=True)
     seller_phone = serializers.CharField(source='seller.phone', read_only=True)
     subject_name = serializers.CharField(source='subject.name', read_only=True)
     subject_code = serializers.CharField(source='subject.code', read_only=True)
     in_wishlist = serializers.SerializerMethodField()
-    avg_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    avg_rating = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Note
@@ -48,20 +59,14 @@ class NoteSerializer(serializers.ModelSerializer):
         ]
     
     def get_in_wishlist(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Wishlist.objects.filter(user=request.user, note=obj).exists()
-        return False
-    
-    def get_avg_rating(self, obj):
-        reviews = Review.objects.filter(note=obj)
-        if reviews.exists():
-            from django.db.models import Avg
-            return round(reviews.aggregate(avg=Avg('rating'))['avg'], 2)
-        return 0.00
-    
-    def get_review_count(self, obj):
-        return Review.objects.filter(note=obj).count()
+        # Precomputed ids (async views) or the request user's cached set
+        wishlist_ids = self.context.get('wishlist_ids')
+        if wishlist_ids is None:
+            request = self.context.get('request')
+            if request is None:
+                return False
+            wishlist_ids = wishlists.for_request(request)
+        return obj.pk in wishlist_ids
 
 class WishlistSerializer(serializers.ModelSerializer):
     note = NoteSerializer(read_only=True)
@@ -113,7 +118,7 @@ class ActivitySerializer(serializers.Serializer):
 
 class TopNoteSerializer(serializers.ModelSerializer):
     subject_name = serializers.CharField(source='subject.name', read_only=True)
-    avg_rating = serializers.SerializerMethodField()
+    avg_rating = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Note
@@ -121,13 +126,6 @@ class TopNoteSerializer(serializers.ModelSerializer):
             'id', 'title', 'price', 'views', 'subject_name', 'avg_rating',
             'contact_info', 'is_free'
         ]
-    
-    def get_avg_rating(self, obj):
-        reviews = Review.objects.filter(note=obj)
-        if reviews.exists():
-            from django.db.models import Avg
-            return round(reviews.aggregate(avg=Avg('rating'))['avg'], 2)
-        return 0.00
 
 # Analytics Serializers
 class AnalyticsSerializer(serializers.Serializer):
@@ -0,0 +1,193 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import caching, ratings, search, seller_stats, sqltrace, tags
+from .authentication import user_cache
+from .models import Account, Note, Order, Review, SellerStats, Subject, UserProfile, Wishlist
+
+
+# Search index maintenance
+@receiver(post_save, sender=Note)
+def index_note_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not search.INDEXED_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: search.index_note(instance))
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note_on_delete(sender, instance, **kwargs):
+    # Postings cascade with the note; only the cached corpus stats are stale
+    transaction.on_commit(search.invalidate_stats)
+
+
+@receiver(post_save, sender=Subject)
+def reindex_subject_on_save(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: search.reindex_notes(instance.notes.filter(is_approved=True)))
+
+
+# Tag links
+@receiver(post_init, sender=Note)
+def remember_note_tags(sender, instance, **kwargs):
+    instance._stored_tags = instance.__dict__.get('tags')
+
+
+@receiver(post_save, sender=Note)
+def sync_tags_on_save(sender, instance, created, **kwargs):
+    current = instance.__dict__.get('tags', instance._stored_tags)
+    if (created and current) or (not created and current != instance._stored_tags):
+        tags.sync_note_tags(instance)
+    instance._stored_tags = current
+
+
+# Rating aggregates (Note.rating_sum/review_count and seller stats)
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    # Read __dict__ directly so deferred fields are not fetched
+    instance._stored_rating = (
+        instance.__dict__.get('note_id'),
+        instance.__dict__.get('seller_id'),
+        instance.__dict__.get('rating'),
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    old_note_id, old_seller_id, old_rating = instance._stored_rating
+    if created:
+        ratings.apply_delta(instance.note_id, instance.rating, 1)
+        seller_stats.adjust(instance.seller_id, rating_sum=instance.rating, rating_count=1)
+    elif old_rating is None:
+        ratings.recompute(instance.note_id)
+        seller_stats.rebuild_for(instance.seller_id)
+    else:
+        if old_note_id != instance.note_id:
+            ratings.apply_delta(old_note_id, -old_rating, -1)
+            ratings.apply_delta(instance.note_id, instance.rating, 1)
+        else:
+            ratings.apply_delta(instance.note_id, instance.rating - old_rating, 0)
+        if old_seller_id != instance.seller_id:
+            seller_stats.adjust(old_seller_id, rating_sum=-old_rating, rating_count=-1)
+            seller_stats.adjust(instance.seller_id, rating_sum=instance.rating, rating_count=1)
+        else:
+            seller_stats.adjust(instance.seller_id, rating_sum=instance.rating - old_rating)
+    instance._stored_rating = (instance.note_id, instance.seller_id, instance.rating)
+
+
+@receiver(pre_delete, sender=Review)
+def load_deferred_review_rating(sender, instance, **kwargs):
+    if None in instance._stored_rating:
+        instance._stored_rating = Review.objects.filter(pk=instance.pk).values_list(
+            'note_id', 'seller_id', 'rating'
+        ).get()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    note_id, seller_id, rating = instance._stored_rating
+    ratings.apply_delta(note_id, -rating, -1)
+    seller_stats.adjust(seller_id, rating_sum=-rating, rating_count=-1)
+
+
+# Seller stats
+@receiver(post_init, sender=Note)
+def remember_note_state(sender, instance, **kwargs):
+    instance._stored_state = (instance.__dict__.get('subject_id'), instance.__dict__.get('views'))
+
+
+@receiver(post_save, sender=Note)
+def update_seller_stats_on_note_save(sender, instance, created, **kwargs):
+    old_subject_id, _ = instance._stored_state
+    if created:
+        seller_stats.adjust_notes(
+            instance.seller_id, 1, subject_id=instance.subject_id, created_at=instance.created_at, views=instance.views
+        )
+    elif old_subject_id is not None and old_subject_id != instance.subject_id:
+        seller_stats.adjust_notes(
+            instance.seller_id, 0, subject_id=instance.subject_id, old_subject_id=old_subject_id
+        )
+    instance._stored_state = (instance.subject_id, instance.__dict__.get('views'))
+
+
+@receiver(post_delete, sender=Note)
+def update_seller_stats_on_note_delete(sender, instance, **kwargs):
+    subject_id, views = instance._stored_state
+    seller_stats.adjust_notes(
+        instance.seller_id, -1, subject_id=subject_id, created_at=instance.created_at, views=-(views or 0)
+    )
+
+
+@receiver(post_save, sender=Wishlist)
+def update_seller_stats_on_wishlist_add(sender, instance, created, **kwargs):
+    if created:
+        seller_stats.adjust(instance.user_id, wishlist_count=1)
+
+
+@receiver(post_delete, sender=Wishlist)
+def update_seller_stats_on_wishlist_remove(sender, instance, **kwargs):
+    seller_stats.adjust(instance.user_id, wishlist_count=-1)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._stored_completed = instance.__dict__.get('status') == 'completed'
+
+
+@receiver(post_save, sender=Order)
+def update_seller_stats_on_order_save(sender, instance, created, **kwargs):
+    was_completed = instance._stored_completed and not created
+    is_completed = instance.status == 'completed'
+    if was_completed != is_completed:
+        delta = 1 if is_completed else -1
+        seller_stats.adjust(instance.seller_id, total_sales=delta)
+        seller_stats.adjust(instance.buyer_id, total_purchases=delta)
+    instance._stored_completed = is_completed
+
+
+@receiver(post_delete, sender=Order)
+def update_seller_stats_on_order_delete(sender, instance, **kwargs):
+    if instance._stored_completed:
+        seller_stats.adjust(instance.seller_id, total_sales=-1)
+        seller_stats.adjust(instance.buyer_id, total_purchases=-1)
+
+
+@receiver(post_save, sender=UserProfile)
+def sync_new_profile(sender, instance, created, **kwargs):
+    if created:
+        seller_stats.sync_profiles(SellerStats.objects.filter(pk=instance.user_id))
+
+
+# Anonymous response cache invalidation
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_catalog_version(sender, **kwargs):
+    transaction.on_commit(caching.bump_catalog_version)
+
+
+# Per-user validators (conditional.py)
+@receiver(post_save, sender=Wishlist)
+@receiver(post_delete, sender=Wishlist)
+def bump_user_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: caching.bump_user_version(instance.user_id))
+
+
+# Authenticated user cache
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def evict_cached_user(sender, instance, **kwargs):
+    # Evict now for this process, and again after commit in case a concurrent
+    # request re-cached the old row in between
+    user_cache.invalidate(instance.pk)
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+# SQL observers (metrics, profiling) on every thread's connection
+@receiver(connection_created)
+def install_sql_observers(sender, connection, **kwargs):
+    sqltrace.install(connection)
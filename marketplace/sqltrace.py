@@ -0,0 +1,56 @@
+"""
+Per-request SQL observers that also see queries run on other threads.
+
+connection.execute_wrapper() only wraps the calling thread's connection, but
+the async views run queries on worker threads (run_concurrently, the async
+ORM) and batch sub-requests may run on a thread pool. Instead every
+connection gets one wrapper when it opens (signals.py), which reports each
+query to the observers registered for the current context. asgiref copies
+contextvars into sync_to_async threads, so a request's observers follow its
+queries wherever they run.
+
+Observers implement record(sql, started, duration) and may be called from
+several threads at once.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+_observers = contextvars.ContextVar('sql_observers', default=())
+
+
+def _execute(execute, sql, params, many, context):
+    observers = _observers.get()
+    if not observers:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for observer in observers:
+            observer.record(sql, started, duration)
+
+
+def install(db_connection):
+    """
+    Report this connection's queries to the current observers (idempotent)
+    """
+    if _execute not in db_connection.execute_wrappers:
+        db_connection.execute_wrappers.append(_execute)
+
+
+@contextmanager
+def observe(observer):
+    """
+    Send every query of the current context, on any thread, to ``observer``
+    """
+    # Connections opened before the signal receiver was connected
+    install(connection)
+    token = _observers.set(_observers.get() + (observer,))
+    try:
+        yield observer
+    finally:
+        _observers.reset(token)
@@ -0,0 +1,317 @@
+"""
+Large-scale synthetic data for reproducing production-sized workloads.
+
+Used by ``populate_data --users N --notes N ...``. Everything is derived from
+one seeded random.Random, so the same options produce the same dataset.
+Popularity is skewed the way real traffic is: a few subjects hold most notes,
+a few power sellers write most of them, and a long tail of notes gets few
+reviews or wishlist saves. Rows are written with bulk_create in batches and
+the denormalized tables (ratings, seller stats, search index, leaderboards)
+are rebuilt once at the end instead of through per-row signals.
+"""
+import random
+import time
+import uuid
+from array import array
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+from math import gcd
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, leaderboards, ratings, search, seller_stats
+from .models import Account, Note, Order, Review, Subject, Tag, UserProfile, Wishlist
+
+# Generated accounts use this prefix on phone and student_id so reruns can skip them
+PHONE_PREFIX = '7'
+STUDENT_ID_PREFIX = 'GEN'
+PASSWORD = 'password123'
+
+# Zipf exponents: higher means more concentrated on the top entries
+SUBJECT_SKEW = 1.1
+SELLER_SKEW = 1.2
+NOTE_SKEW = 1.0
+SELLER_SHARE = 0.3  # Fraction of users who sell at all
+
+HISTORY_DAYS = 730
+RATING_WEIGHTS = [4, 6, 15, 35, 40]  # 1..5 stars
+PRICES = [0, 0, 0, 50, 100, 150, 200, 250, 300, 500, 750]
+COLLEGES = ['IIT Delhi', 'IIT Bombay', 'IIT Madras', 'IIT Kanpur', 'BITS Pilani', 'NIT Trichy', 'VIT Vellore']
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics', 'Mechanical', 'Civil']
+TAG_VOCABULARY = [
+    'exam prep', 'handwritten', 'typed', 'solved problems', 'previous papers', 'lab manual',
+    'cheat sheet', 'summary', 'diagrams', 'formulas', 'assignments', 'mid sem', 'end sem',
+    'viva', 'important questions', 'short notes', 'detailed', 'beginner', 'advanced', 'revision',
+]
+REVIEW_COMMENTS = [
+    'Very helpful, thanks!', 'Clear and well organized.', 'Good notes but a few topics are missing.',
+    'Saved me before the exam.', 'Average quality.', 'Not what I expected.', 'Excellent diagrams.',
+]
+
+
+def zipf_weights(n, skew):
+    """
+    Cumulative Zipf weights for ranks 1..n, for use with bisect
+    """
+    return array('d', accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create keep the created_at/updated_at values set on the instances
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class SyntheticDataGenerator:
+    def __init__(self, command, subjects_data, note_titles, descriptions, users=0, notes=0, reviews=0,
+                 wishlists=0, orders=0, seed=42, batch_size=5000, skip_search_index=False, **options):
+        self.command = command
+        self.subjects_data = subjects_data
+        self.note_titles = note_titles
+        self.descriptions = descriptions
+        self.counts = {'users': users, 'notes': notes, 'reviews': reviews, 'wishlists': wishlists, 'orders': orders}
+        self.seed = seed
+        self.batch_size = max(batch_size, 1)
+        self.skip_search_index = skip_search_index
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+
+        self.user_ids = array('q')
+        self.note_sellers = array('q')  # Seller id per generated note index
+        self.note_prices = array('d')
+        self.note_base = uuid.UUID(int=self.rng.getrandbits(128)).int & ~0xFFFFFFFF
+
+    def log(self, message):
+        self.command.stdout.write(message)
+
+    def note_id(self, index):
+        # Deterministic ids so only seller/price arrays are kept in memory
+        return uuid.UUID(int=self.note_base | index)
+
+    def random_date(self, after=None):
+        start = after or self.now - timedelta(days=HISTORY_DAYS)
+        span = (self.now - start).total_seconds()
+        # Skew towards recent dates: activity grows over time
+        return start + timedelta(seconds=span * (self.rng.random() ** 0.5))
+
+    def pick(self, cum_weights):
+        return bisect(cum_weights, self.rng.random() * cum_weights[-1])
+
+    def run(self):
+        started = time.monotonic()
+        subjects = self.create_subjects()
+        self.create_users()
+        if not self.user_ids:
+            self.log('No accounts available to own notes.')
+            return
+
+        self.create_notes(subjects)
+        if self.note_sellers:
+            self.create_reviews()
+            self.create_wishlists()
+            self.create_orders()
+        self.rebuild_derived()
+        self.command.stdout.write(self.command.style.SUCCESS(
+            f'Synthetic data generated in {time.monotonic() - started:.1f}s (seed {self.seed})'
+        ))
+
+    def create_subjects(self):
+        for subject_data in self.subjects_data:
+            Subject.objects.get_or_create(code=subject_data['code'], defaults=subject_data)
+        subjects = list(Subject.objects.order_by('pk'))
+        self.rng.shuffle(subjects)  # Which subjects are popular depends on the seed
+        return subjects
+
+    def create_users(self):
+        total = self.counts['users']
+        existing = Account.objects.filter(phone__startswith=PHONE_PREFIX, phone__regex=r'^7\d{9}$').count()
+        password = make_password(PASSWORD)  # Hashing is slow; every generated account shares it
+        for start in range(existing, total, self.batch_size):
+            end = min(start + self.batch_size, total)
+            accounts = [
+                Account(
+                    phone=f'{PHONE_PREFIX}{i:09d}', name=f'Student {i}', password=password,
+                    date_joined=self.random_date(),
+                )
+                for i in range(start, end)
+            ]
+            with transaction.atomic():
+                Account.objects.bulk_create(accounts, batch_size=self.batch_size)
+                # Not every backend sets primary keys on bulk_create, so read them back
+                ids = dict(Account.objects.filter(
+                    phone__in=[account.phone for account in accounts]
+                ).values_list('phone', 'pk'))
+                UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user_id=ids[account.phone],
+                        student_id=f'{STUDENT_ID_PREFIX}{i:09d}',
+                        college=self.rng.choice(COLLEGES),
+                        department=self.rng.choice(DEPARTMENTS),
+                        year=self.rng.randint(1, 4),
+                        phone=account.phone,
+                    )
+                    for i, account in zip(range(start, end), accounts)
+                ], batch_size=self.batch_size)
+            self.log(f'Users: {end}/{total}')
+        if existing:
+            self.log(f'Reused {min(existing, total)} previously generated users')
+
+        self.user_ids = array('q', Account.objects.order_by('pk').values_list('pk', flat=True))
+
+    def create_notes(self, subjects):
+        total = self.counts['notes']
+        if not total:
+            return
+        sellers = list(self.user_ids)
+        self.rng.shuffle(sellers)
+        sellers = sellers[:max(1, int(len(sellers) * SELLER_SHARE))]
+        seller_weights = zipf_weights(len(sellers), SELLER_SKEW)
+        subject_weights = zipf_weights(len(subjects), SUBJECT_SKEW)
+        tag_ids = [tag.pk for tag in self._vocabulary_tags()]
+        tag_names = {tag.pk: tag.name for tag in Tag.objects.filter(pk__in=tag_ids)}
+        through = Note.tag_set.through
+
+        for start in range(0, total, self.batch_size):
+            end = min(start + self.batch_size, total)
+            notes = []
+            links = []
+            for index in range(start, end):
+                seller_id = sellers[self.pick(seller_weights)]
+                subject = subjects[self.pick(subject_weights)]
+                price = self.rng.choice(PRICES)
+                created_at = self.random_date()
+                note_tags = self.rng.sample(tag_ids, self.rng.randint(1, 4))
+                note = Note(
+                    id=self.note_id(index),
+                    seller_id=seller_id,
+                    subject=subject,
+                    title=f'{self.rng.choice(self.note_titles)} #{index}',
+                    description=self.rng.choice(self.descriptions),
+                    price=Decimal(price),
+                    is_free=price == 0,
+                    semester=self.rng.randint(1, 8),
+                    year=self.rng.randint(2018, self.now.year),
+                    tags=', '.join(tag_names[tag_id] for tag_id in note_tags),
+                    views=int(self.rng.paretovariate(1.2) * 10),
+                    downloads=int(self.rng.paretovariate(1.5)),
+                    is_approved=self.rng.random() < 0.95,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                notes.append(note)
+                links.extend(through(note_id=note.id, tag_id=tag_id) for tag_id in note_tags)
+                self.note_sellers.append(seller_id)
+                self.note_prices.append(price)
+
+            with explicit_timestamps(Note), transaction.atomic():
+                # Same seed, same ids: a rerun skips notes it already wrote
+                Note.objects.bulk_create(notes, batch_size=self.batch_size, ignore_conflicts=True)
+                through.objects.bulk_create(links, batch_size=self.batch_size, ignore_conflicts=True)
+            self.log(f'Notes: {end}/{total}')
+
+    def _vocabulary_tags(self):
+        Tag.objects.bulk_create([Tag(name=name) for name in TAG_VOCABULARY], ignore_conflicts=True)
+        return Tag.objects.filter(name__in=TAG_VOCABULARY).order_by('name')
+
+    def _popular_note(self, cum_weights, stride):
+        # Map popularity rank to a note index with a stride coprime to the count,
+        # so popular notes are spread over sellers and creation dates
+        rank = self.pick(cum_weights)
+        return (rank * stride) % len(self.note_sellers)
+
+    def _stride(self):
+        count = len(self.note_sellers)
+        stride = self.rng.randrange(1, count + 1) | 1
+        while count > 1 and gcd(stride, count) != 1:
+            stride += 2
+        return stride
+
+    def _bulk_insert(self, label, model, total, make_row):
+        """
+        Insert ``total`` generated rows against popular notes in batches, skipping duplicates
+        """
+        if not total:
+            return
+        cum_weights = zipf_weights(len(self.note_sellers), NOTE_SKEW)
+        stride = self._stride()
+        for start in range(0, total, self.batch_size):
+            end = min(start + self.batch_size, total)
+            rows = []
+            for _ in range(start, end):
+                index = self._popular_note(cum_weights, stride)
+                user_id = self.user_ids[self.rng.randrange(len(self.user_ids))]
+                if user_id == self.note_sellers[index]:
+                    continue
+                rows.append(make_row(index, user_id))
+            with explicit_timestamps(model), transaction.atomic():
+                model.objects.bulk_create(rows, batch_size=self.batch_size, ignore_conflicts=True)
+            self.log(f'{label}: {end}/{total}')
+
+    def create_reviews(self):
+        def make_row(index, user_id):
+            return Review(
+                reviewer_id=user_id,
+                seller_id=self.note_sellers[index],
+                note_id=self.note_id(index),
+                rating=self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                comment=self.rng.choice(REVIEW_COMMENTS),
+                created_at=self.random_date(),
+            )
+        self._bulk_insert('Reviews', Review, self.counts['reviews'], make_row)
+
+    def create_wishlists(self):
+        def make_row(index, user_id):
+            return Wishlist(user_id=user_id, note_id=self.note_id(index), created_at=self.random_date())
+        self._bulk_insert('Wishlists', Wishlist, self.counts['wishlists'], make_row)
+
+    def create_orders(self):
+        def make_row(index, user_id):
+            created_at = self.random_date()
+            completed = self.rng.random() < 0.8
+            return Order(
+                id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                buyer_id=user_id,
+                seller_id=self.note_sellers[index],
+                note_id=self.note_id(index),
+                amount=Decimal(self.note_prices[index]),
+                status='completed' if completed else self.rng.choice(['pending', 'cancelled']),
+                payment_method='upi',
+                created_at=created_at,
+                completed_at=created_at if completed else None,
+            )
+        self._bulk_insert('Orders', Order, self.counts['orders'], make_row)
+
+    def rebuild_derived(self):
+        """
+        Recompute denormalized data that bulk_create skipped the signals for
+        """
+        self.log('Reconciling note ratings...')
+        ratings.reconcile(batch_size=self.batch_size)
+        self.log('Rebuilding seller stats...')
+        seller_stats.rebuild_all(batch_size=self.batch_size)
+        if self.skip_search_index:
+            self.log('Skipped search index (run rebuild_search_index later)')
+        else:
+            self.log('Rebuilding search index...')
+            search.rebuild_index()
+        self.log('Refreshing leaderboards...')
+        leaderboards.refresh_all()
+        caching.bump_catalog_version()
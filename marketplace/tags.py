@@ -0,0 +1,64 @@
+"""
+Tag normalization and Note.tags -> Note.tag_set syncing.
+
+Note.tags stays the comma-separated string the API reads and writes; the
+Tag rows linked through Note.tag_set back exact, indexed ?tag= filtering.
+"""
+import re
+
+from .models import Note, Tag
+
+MAX_TAG_LENGTH = 50
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize(name):
+    return WHITESPACE_RE.sub(' ', name).strip().lower()[:MAX_TAG_LENGTH]
+
+
+def parse_tags(value):
+    """
+    Split a comma-separated tag string into unique normalized names, in order
+    """
+    names = (normalize(part) for part in (value or '').split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def get_or_create_tags(names):
+    """
+    Return Tag rows for the given names, creating missing ones in one query
+    """
+    if not names:
+        return []
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return list(Tag.objects.filter(name__in=names))
+
+
+def sync_note_tags(note):
+    note.tag_set.set(get_or_create_tags(parse_tags(note.tags)))
+
+
+def sync_bulk(notes):
+    """
+    Link freshly bulk-created notes to their tags (they never went through post_save)
+    """
+    names_by_note = [(note, parse_tags(note.tags)) for note in notes]
+    all_names = list(dict.fromkeys(name for note, names in names_by_note for name in names))
+    tag_ids = {tag.name: tag.pk for tag in get_or_create_tags(all_names)}
+    NoteTag = Note.tag_set.through
+    NoteTag.objects.bulk_create([
+        NoteTag(note_id=note.pk, tag_id=tag_ids[name])
+        for note, names in names_by_note
+        for name in names
+    ], ignore_conflicts=True)
+
+
+def filter_by_tags(queryset, names):
+    """
+    Restrict a Note queryset to notes carrying every given tag
+    """
+    for name in names:
+        name = normalize(name)
+        if name:
+            queryset = queryset.filter(tag_set__name=name)
+    return queryset
@@ -0,0 +1,43 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from marketplace import pagination
+
+
+def encode(payload):
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+class DecodeCursorTests(SimpleTestCase):
+    """
+    Malformed cursors raise InvalidCursor (a 400), never reach the query
+    """
+
+    def test_round_trip(self):
+        row = {'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), 'id': uuid.uuid4()}
+        created_at, pk, reverse = pagination.decode_cursor(pagination.encode_cursor(row, reverse=True))
+        self.assertEqual((created_at, pk, reverse), (row['created_at'], row['id'], True))
+
+    def test_invalid(self):
+        valid_id = str(uuid.uuid4())
+        cursors = [
+            '%%%',
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+            encode([1]),
+            encode({'i': valid_id}),
+            encode({'c': '2024-01-01T00:00:00+00:00'}),
+            encode({'c': '2024-01-01T00:00:00+00:00', 'i': 'not-a-uuid'}),
+            encode({'c': '2024-01-01T00:00:00+00:00', 'i': 5}),
+            encode({'c': '2024-13-01T00:00:00+00:00', 'i': valid_id}),
+            encode({'c': '2024-01-01T00:00:00', 'i': valid_id}),
+            encode({'c': 5, 'i': valid_id}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(pagination.InvalidCursor):
+                    pagination.decode_cursor(cursor)
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from rest_framework.renderers import JSONRenderer
+
+from marketplace import projection, wishlists
+from marketplace.models import Account, Note, Review, Subject, Wishlist
+from marketplace.serializers import NoteSerializer, WishlistSerializer
+
+
+class ProjectionEquivalenceTests(TestCase):
+    """
+    projection.serialize_notes / serialize_wishlist must render exactly what
+    NoteSerializer / WishlistSerializer render
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = Account.objects.create_user(phone='9000000001', password='x', name='Seller One')
+        cls.student = Account.objects.create_user(phone='9000000002', password='x', name='Student')
+        reviewers = [
+            Account.objects.create_user(phone=f'900000010{index}', password='x', name=f'Reviewer {index}')
+            for index in range(3)
+        ]
+        subject = Subject.objects.create(name='Data Structures', code='CS201')
+        other_subject = Subject.objects.create(name='Calculus', code='MA101')
+
+        cls.notes = [
+            Note.objects.create(
+                seller=cls.seller, subject=subject, title='Trees and graphs', description='BFS, DFS',
+                price=Decimal('149.50'), semester=3, year=2024, tags='trees, graphs, DSA',
+                contact_info='@seller', is_free=False, is_approved=True, views=12, downloads=3,
+            ),
+            Note.objects.create(
+                seller=cls.seller, subject=other_subject, title='Limits', description='Epsilon-delta',
+                semester=1, year=2023, is_approved=True,
+            ),
+            Note.objects.create(
+                seller=cls.seller, subject=subject, title='Heaps', description='Priority queues',
+                price=Decimal('10'), semester=3, year=2024, tags='heaps', is_free=False, is_approved=True,
+            ),
+        ]
+        # Ratings 5, 4, 2 give a rounded average (3.67); one note has no reviews
+        for reviewer, rating, note in [(0, 5, 0), (1, 4, 0), (2, 2, 0), (0, 3, 2)]:
+            Review.objects.create(
+                reviewer=reviewers[reviewer], seller=cls.seller, note=cls.notes[note], rating=rating, comment='ok'
+            )
+        Wishlist.objects.create(user=cls.student, note=cls.notes[0])
+        Wishlist.objects.create(user=cls.student, note=cls.notes[2])
+
+    def request(self, user=None):
+        request = RequestFactory().get('/api/notes/')
+        request.user = user or AnonymousUser()
+        return request
+
+    def assertSameJSON(self, expected, actual):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def approved(self):
+        return Note.objects.filter(is_approved=True).order_by('-created_at', '-id')
+
+    def test_notes_anonymous(self):
+        request = self.request()
+        expected = NoteSerializer(
+            self.approved().select_related('seller', 'subject'), many=True, context={'request': request}
+        ).data
+        actual = projection.serialize_notes(projection.note_values(self.approved()), None, wishlists.for_request(request))
+        self.assertSameJSON(expected, actual)
+        self.assertFalse(any(row['in_wishlist'] for row in actual))
+
+    def test_notes_authenticated(self):
+        request = self.request(self.student)
+        expected = NoteSerializer(
+            self.approved().select_related('seller', 'subject'), many=True, context={'request': request}
+        ).data
+        actual = projection.serialize_notes(projection.note_values(self.approved()), None, wishlists.for_request(request))
+        self.assertSameJSON(expected, actual)
+        self.assertEqual(sum(row['in_wishlist'] for row in actual), 2)
+
+    def test_notes_sparse_fieldsets(self):
+        request = self.request(self.student)
+        for fields in [['title', 'price', 'subject_name'], ['in_wishlist', 'avg_rating'], ['id'], ['created_at']]:
+            with self.subTest(fields=fields):
+                expected = NoteSerializer(
+                    self.approved().select_related('seller', 'subject'), many=True, fields=fields,
+                    context={'request': request}
+                ).data
+                actual = projection.serialize_notes(
+                    projection.note_values(self.approved(), fields), fields, wishlists.for_request(request)
+                )
+                self.assertSameJSON(expected, actual)
+                self.assertEqual({key for row in actual for key in row}, set(fields))
+
+    def test_wishlist(self):
+        request = self.request(self.student)
+        items = Wishlist.objects.filter(user=self.student)
+        expected = WishlistSerializer(
+            items.select_related('note__seller', 'note__subject'), many=True, context={'request': request}
+        ).data
+        actual = projection.serialize_wishlist(projection.wishlist_values(items), wishlists.for_request(request))
+        self.assertSameJSON(expected, actual)
+
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Read-heavy endpoints have native async versions for ASGI deployments
+if settings.ASYNC_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
     # Authentication
     path('register/', views.register_user, name='register'),
@@ -10,23 +17,41 @@ urlpatterns = [
     path('profile/', views.user_profile, name='user_profile'),
     
     # Subjects
-    path('subjects/', views.subject_list, name='subject_list'),
+    path('subjects/', read_views.subject_list, name='subject_list'),
     
     # Notes
-    path('notes/', views.note_list, name='note_list'),
+    path('notes/', read_views.note_list, name='note_list'),
     path('notes/create/', views.create_note, name='create_note'),
-    path('search/', views.search_notes, name='search_notes'),
+    path('notes/bulk/', views.bulk_create_notes, name='bulk_create_notes'),
+    path('notes/facets/', views.note_facets, name='note_facets'),
+    path('notes/<uuid:note_id>/', views.note_detail, name='note_detail'),
+    path('notes/<uuid:note_id>/related/', views.related_notes, name='related_notes'),
+    path('search/', read_views.search_notes, name='search_notes'),
     
     # Wishlist
     path('wishlist/', views.wishlist_list, name='wishlist_list'),
     path('wishlist/add/', views.add_to_wishlist, name='add_to_wishlist'),
+    path('wishlist/bulk/', views.bulk_wishlist, name='bulk_wishlist'),
     path('wishlist/<str:wishlist_id>/', views.remove_from_wishlist, name='remove_from_wishlist'),
     
     # Dashboard
-    path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
-    path('dashboard/activity/', views.dashboard_activity, name='dashboard_activity'),
-    path('dashboard/top-notes/', views.dashboard_top_notes, name='dashboard_top_notes'),
+    path('dashboard/', read_views.dashboard_overview, name='dashboard_overview'),
+    path('dashboard/stats/', read_views.dashboard_stats, name='dashboard_stats'),
+    path('dashboard/activity/', read_views.dashboard_activity, name='dashboard_activity'),
+    path('dashboard/top-notes/', read_views.dashboard_top_notes, name='dashboard_top_notes'),
+    
+    # Leaderboards
+    path('leaderboards/<str:kind>/', views.leaderboard, name='leaderboard'),
     
     # Analytics
-    path('analytics/', views.analytics, name='analytics'),
+    path('analytics/', read_views.analytics, name='analytics'),
+    
+    # Cache
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
+    
+    # Batch
+    path('batch/', views.batch_requests, name='batch_requests'),
+    
+    # Metrics
+    path('metrics/', views.metrics_view, name='metrics'),
 ] 
\ No newline at end of file
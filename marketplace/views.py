@@ -1,7 +1,10 @@
 from django.shortcuts import render
+from django.http import HttpResponse
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
@@ -9,7 +12,25 @@ from django.db import transaction
 from django.db.models import Q, Count, Avg, Sum
 from django.utils import timezone
 from datetime import timedelta
+from functools import partial
 from .models import Account, UserProfile, Subject, Note, Wishlist, Review
+from . import pagination
+from . import caching
+from . import conditional
+from . import counters
+from . import seller_stats
+from . import leaderboards
+from . import filters
+from . import facets
+from . import ingest
+from . import metrics
+from . import dashboard
+from . import batch
+from . import streaming
+from . import fieldsets
+from . import projection
+from . import wishlists
+from . import recommendations
 from .serializers import (
     AccountSerializer, UserProfileSerializer, SubjectSerializer, 
     NoteSerializer, WishlistSerializer
@@ -142,6 +163,8 @@ def create_profile(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional.conditional_response('subject_list')
+@caching.cache_anonymous_response('subject_list')
 def subject_list(request):
     """
     Get list of all subjects
@@ -181,50 +204,81 @@ def create_note(request):
             'error': f'Note creation failed: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_notes(request):
+    """
+    Bulk create notes from a CSV/JSONL upload (multipart field "file") or a raw CSV/JSONL body
+    """
+    if request.content_type.startswith('multipart/'):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                'error': 'Upload a CSV or JSONL file in the "file" field'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        lines = upload
+        input_format = ingest.detect_format(name=upload.name, content_type=upload.content_type)
+    else:
+        lines = request.stream
+        input_format = ingest.detect_format(content_type=request.content_type)
+    
+    if lines is None:
+        return Response({
+            'error': 'No input provided'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if input_format is None:
+        return Response({
+            'error': 'Send text/csv or application/x-ndjson, or upload a .csv or .jsonl file'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Only staff may publish without review
+    approve = request.user.is_staff and request.GET.get('approve') in ('1', 'true')
+    
+    # Rows are streamed and inserted in chunks; invalid rows are reported, not fatal
+    summary = ingest.Importer(request.user, approve=approve).run(lines, input_format)
+    
+    return Response(
+        summary,
+        status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_400_BAD_REQUEST
+    )
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional.conditional_response('note_list', per_user=True)
+@caching.cache_anonymous_response('note_list')
 def note_list(request):
     """
     Get list of all notes with advanced filtering and search
     """
     notes = Note.objects.filter(is_approved=True)
     
-    # Search functionality
-    search = request.GET.get('search', '')
-    if search:
-        notes = notes.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search) |
-            Q(subject__name__icontains=search) |
-            Q(tags__icontains=search)
-        )
+    # Search, tag, subject, semester, year and price filters (cursor pages are
+    # ordered by date, so they skip relevance ranking)
+    notes = filters.filter_notes(notes, request.GET, ranked=not pagination.wants_cursor(request))
     
-    # Subject filter
-    subject = request.GET.get('subject', '')
-    if subject:
-        notes = notes.filter(subject_id=subject)
-    
-    # Semester filter
-    semester = request.GET.get('semester', '')
-    if semester:
-        notes = notes.filter(semester=semester)
-    
-    # Price range filter
-    price_range = request.GET.get('price_range', '')
-    if price_range:
-        if price_range == 'free':
-            notes = notes.filter(is_free=True)
-        elif price_range == '0-100':
-            notes = notes.filter(price__gte=0, price__lte=100, is_free=False)
-        elif price_range == '100-500':
-            notes = notes.filter(price__gte=100, price__lte=500, is_free=False)
-        elif price_range == '500+':
-            notes = notes.filter(price__gte=500, is_free=False)
-    
-    # Add wishlist status for authenticated users
-    if request.user.is_authenticated:
-        for note in notes:
-            note.in_wishlist = Wishlist.objects.filter(user=request.user, note=note).exists()
+    # Sparse fieldsets (?fields= / ?exclude=)
+    try:
+        fields = fieldsets.parse(request.GET)
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Cursor pagination
+    if pagination.wants_cursor(request):
+        try:
+            notes_page, page_info = pagination.paginate_by_cursor(
+                projection.note_values(notes, fields), request, 'note_list'
+            )
+        except pagination.InvalidCursor as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = {'results': projection.serialize_notes(notes_page, fields, wishlists.for_request(request)), **page_info}
+        if request.GET.get('facets'):
+            data['facets'] = facets.get_facets(request)
+        return Response(data)
     
     # Pagination
     page = int(request.GET.get('page', 1))
@@ -232,19 +286,64 @@ def note_list(request):
     start = (page - 1) * page_size
     end = start + page_size
     
-    total_count = notes.count()
-    notes_page = notes[start:end]
+    total_count = pagination.cached_count(notes.order_by(), 'note_list', pagination.filter_params(request))
+    notes_page = projection.note_values(notes, fields)[start:end]
     
-    serializer = NoteSerializer(notes_page, many=True)
-    
-    return Response({
-        'results': serializer.data,
+    data = {
+        'results': projection.serialize_notes(notes_page, fields, wishlists.for_request(request)),
         'count': total_count,
         'next': f'/api/notes/?page={page + 1}' if end < total_count else None,
         'previous': f'/api/notes/?page={page - 1}' if page > 1 else None,
         'current_page': page,
         'total_pages': (total_count + page_size - 1) // page_size
-    })
+    }
+    
+    # Filter counts for the current search
+    if request.GET.get('facets'):
+        data['facets'] = facets.get_facets(request)
+    
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def note_facets(request):
+    """
+    Get per-subject, semester, year and price range counts for the current filters
+    """
+    return Response(facets.get_facets(request))
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def note_detail(request, note_id):
+    """
+    Get a single note and count the view
+    """
+    try:
+        fields = fieldsets.parse(request.GET)
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    notes = fieldsets.prune(Note.objects.select_related('seller', 'subject'), fields, extra=['is_approved', 'seller'])
+    try:
+        note = notes.get(id=note_id)
+    except Note.DoesNotExist:
+        return Response({
+            'error': 'Note not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # Unapproved notes are only visible to their seller
+    if not note.is_approved and note.seller_id != request.user.pk:
+        return Response({
+            'error': 'Note not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # Buffered; written to Note.views in periodic batches
+    counters.record_view(note.pk)
+    
+    serializer = NoteSerializer(note, context={'request': request}, fields=fields)
+    return Response(serializer.data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -275,7 +374,7 @@ def add_to_wishlist(request):
         
         return Response({
             'message': 'Added to wishlist successfully',
-            'wishlist_item': WishlistSerializer(wishlist_item).data
+            'wishlist_item': WishlistSerializer(wishlist_item, context={'wishlist_ids': {note.pk}}).data
         }, status=status.HTTP_201_CREATED)
         
     except Note.DoesNotExist:
@@ -289,18 +388,40 @@ def add_to_wishlist(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional.conditional_response('wishlist_list', per_user=True)
 def wishlist_list(request):
     """
     Get user's wishlist
     """
-    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('note', 'note__subject')
+    wishlist_items = list(projection.wishlist_values(Wishlist.objects.filter(user=request.user)))
     
-    # Add subject name to note data
-    for item in wishlist_items:
-        item.note.subject_name = item.note.subject.name
+    # Every listed note is in the wishlist
+    wishlist_ids = {item['note__id'] for item in wishlist_items}
+    return Response(projection.serialize_wishlist(wishlist_items, wishlist_ids))
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_wishlist(request):
+    """
+    Add and remove several wishlist notes at once ({"add": [...], "remove": [...]} or {"set": [...]})
+    """
+    try:
+        add, remove, replace = wishlists.parse_changes(request.data)
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = WishlistSerializer(wishlist_items, many=True)
-    return Response(serializer.data)
+    summary = wishlists.apply_changes(request.user.pk, add, remove, replace)
+    
+    # The resulting wishlist
+    wishlist_items = list(projection.wishlist_values(Wishlist.objects.filter(user=request.user)))
+    wishlist_ids = {item['note__id'] for item in wishlist_items}
+    
+    return Response({
+        **summary,
+        'wishlist': projection.serialize_wishlist(wishlist_items, wishlist_ids)
+    }, status=status.HTTP_200_OK)
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -345,26 +466,9 @@ def dashboard_stats(request):
     """
     Get dashboard statistics for the user
     """
-    user = request.user
-    
-    # Get user's notes count
-    total_notes = Note.objects.filter(seller=user).count()
-    
-    # Get total sales (this would be calculated from orders in a real app)
-    total_sales = 0  # Placeholder for now
-    
-    # Get wishlist count
-    wishlist_count = Wishlist.objects.filter(user=user).count()
-    
-    # Get average rating from reviews
-    avg_rating = Review.objects.filter(seller=user).aggregate(Avg('rating'))['rating__avg'] or 0.00
+    stats = seller_stats.get_for_user(request.user)
     
-    return Response({
-        'total_notes': total_notes,
-        'total_sales': total_sales,
-        'wishlist_count': wishlist_count,
-        'rating': round(avg_rating, 2)
-    })
+    return Response(dashboard.stats_data(stats))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -374,33 +478,10 @@ def dashboard_activity(request):
     """
     user = request.user
     
-    # Get recent notes created
-    recent_notes = Note.objects.filter(seller=user).order_by('-created_at')[:5]
-    
-    # Get recent wishlist additions
-    recent_wishlist = Wishlist.objects.filter(user=user).order_by('-created_at')[:5]
-    
-    # Combine and sort activities
-    activities = []
-    
-    for note in recent_notes:
-        activities.append({
-            'type': 'note_created',
-            'title': f'Created note: {note.title}',
-            'created_at': note.created_at
-        })
+    # Recent notes created and wishlist additions, newest first
+    activities = dashboard.activity_data(dashboard.recent_notes(user), dashboard.recent_wishlist(user))
     
-    for wishlist_item in recent_wishlist:
-        activities.append({
-            'type': 'wishlist_added',
-            'title': f'Added to wishlist: {wishlist_item.note.title}',
-            'created_at': wishlist_item.created_at
-        })
-    
-    # Sort by creation date
-    activities.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    return Response(activities[:10])  # Return top 10 activities
+    return Response(activities)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -408,63 +489,113 @@ def dashboard_top_notes(request):
     """
     Get top rated notes for the dashboard
     """
-    # Get notes with highest ratings
-    top_notes = Note.objects.filter(is_approved=True).annotate(
-        avg_rating=Avg('reviews__rating')
-    ).filter(avg_rating__isnull=False).order_by('-avg_rating', '-views')[:10]
+    # Precomputed leaderboard, serialized once for all users
+    return Response(dashboard.top_notes())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_overview(request):
+    """
+    Get several dashboard sections in one response (?sections=stats,activity,top_notes,analytics)
+    """
+    try:
+        sections = dashboard.parse_sections(request.GET.get('sections', ''))
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Add subject names
-    for note in top_notes:
-        note.subject_name = note.subject.name
+    return Response(dashboard.build(request.user, sections))
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def leaderboard(request, kind):
+    """
+    Get a ranked note leaderboard, optionally per subject or semester
+    """
+    if kind not in leaderboards.KINDS:
+        return Response({
+            'error': f'Unknown leaderboard: {kind}'
+        }, status=status.HTTP_404_NOT_FOUND)
     
-    serializer = NoteSerializer(top_notes, many=True)
-    return Response(serializer.data)
+    try:
+        scope = leaderboards.parse_scope(
+            subject=request.GET.get('subject', ''),
+            semester=request.GET.get('semester', '')
+        )
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    limit = pagination.get_page_size(request, default=10)
+    
+    rows = leaderboards.ranked_note_rows(kind, scope, limit=limit)
+    return Response(projection.serialize_notes(rows, wishlist_ids=wishlists.for_request(request)))
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def related_notes(request, note_id):
+    """
+    Get notes students also saved, or the subject's top rated notes when there are none yet
+    """
+    note = Note.objects.filter(pk=note_id, is_approved=True).values('subject_id').first()
+    if note is None:
+        return Response({
+            'error': 'Note not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    limit = pagination.get_page_size(request, default=10)
+    rows = recommendations.related_note_rows(note_id, note['subject_id'], limit=limit)
+    return Response(projection.serialize_notes(rows, wishlist_ids=wishlists.for_request(request)))
 
 # Enhanced Search Endpoint
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional.conditional_response('search_notes', per_user=True)
+@caching.cache_anonymous_response('search_notes')
 def search_notes(request):
     """
     Advanced search functionality
     """
-    query = request.GET.get('q', '')
-    subject = request.GET.get('subject', '')
-    semester = request.GET.get('semester', '')
-    price_min = request.GET.get('price_min', '')
-    price_max = request.GET.get('price_max', '')
-    year = request.GET.get('year', '')
-    
     notes = Note.objects.filter(is_approved=True)
     
-    if query:
-        notes = notes.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(subject__name__icontains=query) |
-            Q(tags__icontains=query)
-        )
-    
-    if subject:
-        notes = notes.filter(subject_id=subject)
-    
-    if semester:
-        notes = notes.filter(semester=semester)
-    
-    if year:
-        notes = notes.filter(year=year)
+    # Search, tag, subject, semester, year and price filters (cursor pages are
+    # ordered by date, so they skip relevance ranking)
+    notes = filters.filter_notes(notes, request.GET, ranked=not pagination.wants_cursor(request))
     
-    if price_min:
-        notes = notes.filter(price__gte=float(price_min))
-    
-    if price_max:
-        notes = notes.filter(price__lte=float(price_max))
+    # Sparse fieldsets (?fields= / ?exclude=)
+    try:
+        fields = fieldsets.parse(request.GET)
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    notes = fieldsets.prune(notes, fields)
     
-    # Add wishlist status for authenticated users
-    if request.user.is_authenticated:
-        for note in notes:
-            note.in_wishlist = Wishlist.objects.filter(user=request.user, note=note).exists()
+    # Cursor pagination (the plain list response is kept for existing clients)
+    if pagination.wants_cursor(request):
+        try:
+            notes_page, page_info = pagination.paginate_by_cursor(notes, request, 'search_notes')
+        except pagination.InvalidCursor as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = NoteSerializer(notes_page, many=True, fields=fields, context={'request': request})
+        data = {'results': serializer.data, **page_info}
+        if request.GET.get('facets'):
+            data['facets'] = facets.get_facets(request)
+        return Response(data)
+    
+    # Streamed output for wide searches and exports
+    if streaming.wants_stream(request):
+        if fields is None:
+            notes = notes.select_related('seller', 'subject')
+        return streaming.stream_json_list(
+            notes, partial(NoteSerializer, fields=fields), context={'request': request}
+        )
     
-    serializer = NoteSerializer(notes, many=True)
+    serializer = NoteSerializer(notes, many=True, fields=fields, context={'request': request})
     return Response(serializer.data)
 
 # Analytics Endpoint
@@ -474,22 +605,48 @@ def analytics(request):
     """
     Get analytics data for the user
     """
-    user = request.user
-    
-    # Notes created in last 30 days
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_notes = Note.objects.filter(seller=user, created_at__gte=thirty_days_ago).count()
-    
-    # Views on user's notes
-    total_views = Note.objects.filter(seller=user).aggregate(Sum('views'))['views__sum'] or 0
-    
-    # Popular subjects
-    popular_subjects = Note.objects.filter(seller=user).values('subject__name').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
+    stats = seller_stats.get_for_user(request.user)
     
+    return Response(dashboard.analytics_data(stats))
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    Get hit/miss counters of the anonymous response cache
+    """
     return Response({
-        'recent_notes': recent_notes,
-        'total_views': total_views,
-        'popular_subjects': popular_subjects
+        'catalog_version': caching.get_catalog_version(),
+        'views': caching.stats()
     })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def metrics_view(request):
+    """
+    Expose request metrics in Prometheus text format
+    """
+    # Scrapers authenticate with "Authorization: Token <METRICS_TOKEN>"
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = request.user.is_staff or (token and constant_time_compare(header, f'Token {token}'))
+    if not authorized:
+        return Response({
+            'error': 'Staff access or the metrics token is required'
+        }, status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(metrics.render_all(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch_requests(request):
+    """
+    Run several API requests in one call with one authentication
+    """
+    try:
+        items, parallel = batch.parse(request.data)
+    except batch.BatchError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({'responses': batch.run(request, items, parallel=parallel)})
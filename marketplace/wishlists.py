@@ -0,0 +1,117 @@
+"""
+Per-user wishlist membership for in_wishlist flags.
+
+A user's wishlisted note ids are loaded with one query and cached as a set
+under a key that includes the user's change counter (caching.user_state),
+which wishlist adds and removes bump, so a changed wishlist is simply a new
+key. Within a request the set is also kept on the request, so every row's
+in_wishlist is a set lookup.
+
+apply_changes() adds and removes many notes at once (/api/wishlist/bulk/).
+Adds are one bulk insert and removals one raw DELETE, neither of which sends
+the model signals, so it adjusts the wishlist counter and bumps the user's
+version itself, once per call, for the rows actually inserted and deleted.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import caching, seller_stats
+from .models import Note, Wishlist
+
+NOTE_IDS_KEY = 'wishlist_ids:{user_id}:v{version}.{modified}'
+NOTE_IDS_TIMEOUT = 3600
+REQUEST_ATTR = '_wishlist_note_ids'
+MAX_CHANGES = 500
+
+
+def note_ids(user_id):
+    """
+    frozenset of the note ids in a user's wishlist
+    """
+    version, modified = caching.user_state(user_id)
+    key = NOTE_IDS_KEY.format(user_id=user_id, version=version, modified=modified)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Wishlist.objects.filter(user_id=user_id).values_list('note_id', flat=True))
+        cache.set(key, ids, NOTE_IDS_TIMEOUT)
+    return ids
+
+
+def for_request(request):
+    """
+    note_ids() for the request's user, loaded at most once per request (empty when anonymous)
+    """
+    if not request.user.is_authenticated:
+        return frozenset()
+    ids = getattr(request, REQUEST_ATTR, None)
+    if ids is None:
+        ids = note_ids(request.user.pk)
+        setattr(request, REQUEST_ATTR, ids)
+    return ids
+
+
+def _note_id_list(data, key):
+    values = data.get(key, [])
+    if not isinstance(values, list):
+        raise ValueError(f'"{key}" must be a list of note ids')
+    try:
+        return {uuid.UUID(str(value)) for value in values}
+    except ValueError:
+        raise ValueError(f'"{key}" contains an invalid note id')
+
+
+def parse_changes(data):
+    """
+    Validate a bulk request. Returns (note ids to add, note ids to remove, replacement set or None).
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object with "add"/"remove" lists or a "set" list')
+    add, remove = _note_id_list(data, 'add'), _note_id_list(data, 'remove')
+    replace = _note_id_list(data, 'set') if 'set' in data else None
+    if replace is not None and (add or remove):
+        raise ValueError('Use either "set" or "add"/"remove", not both')
+    if add & remove:
+        raise ValueError('A note cannot be both added and removed')
+    if len(add) + len(remove) + len(replace or ()) > MAX_CHANGES:
+        raise ValueError(f'At most {MAX_CHANGES} note ids per request')
+    return add, remove, replace
+
+
+def apply_changes(user_id, add=(), remove=(), replace=None):
+    """
+    Add and remove wishlist notes in one transaction, or make the wishlist exactly ``replace``.
+    Returns {'added', 'removed', 'not_found'}.
+    """
+    with transaction.atomic():
+        if replace is not None:
+            current = set(Wishlist.objects.filter(user_id=user_id).values_list('note_id', flat=True))
+            add, remove = replace - current, current - replace
+
+        found = set(Note.objects.filter(pk__in=add).values_list('pk', flat=True)) if add else set()
+        added = removed = 0
+        if found:
+            # ignore_conflicts skips notes already saved, including by a concurrent
+            # request, so the rows we inserted are the difference in the count
+            saved = Wishlist.objects.filter(user_id=user_id, note_id__in=found)
+            before = saved.count()
+            Wishlist.objects.bulk_create(
+                [Wishlist(user_id=user_id, note_id=note_id) for note_id in found], ignore_conflicts=True
+            )
+            added = saved.count() - before
+
+        if remove:
+            # Wishlist rows have no dependents, so one DELETE without per-row signals
+            unsaved = Wishlist.objects.filter(user_id=user_id, note_id__in=remove)
+            removed = unsaved._raw_delete(unsaved.db)
+
+        if added or removed:
+            seller_stats.adjust(user_id, wishlist_count=added - removed)
+            transaction.on_commit(lambda: caching.bump_user_version(user_id))
+
+    return {
+        'added': added,
+        'removed': removed,
+        'not_found': sorted(str(note_id) for note_id in set(add) - found),
+    }
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'marketplace.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'marketplace.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,10 +83,60 @@ WSGI_APPLICATION = 'noteshub.wsgi.application'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 DATABASES = {
-    'default': dj_database_url.config(default=os.environ.get("DATABASE_URL"))
+    'default': dj_database_url.config(
+        default=os.environ.get("DATABASE_URL"),
+        conn_max_age=int(os.environ.get("CONN_MAX_AGE", 0)),  # Seconds to reuse a connection
+    )
 }
 
 
+# Cache
+# Local memory for development; production uses Redis (see settings_production.py)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'noteshub',
+    }
+}
+
+# Seconds an anonymous catalog response stays cached (catalog writes invalidate earlier)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Seconds between flushes of buffered note view counts to the database
+VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get("VIEW_COUNT_FLUSH_INTERVAL", 10))
+
+# Redis holding buffered view counts for all workers; empty keeps a per-process buffer
+VIEW_COUNT_REDIS_URL = os.environ.get("VIEW_COUNT_REDIS_URL", "")
+
+# Rows fetched and serialized per chunk by streamed list responses (?stream=1)
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", 500))
+
+# Seconds before a precomputed leaderboard is considered stale and recomputed
+LEADERBOARD_REFRESH_INTERVAL = int(os.environ.get("LEADERBOARD_REFRESH_INTERVAL", 300))
+
+# Per-view request metrics served at /api/metrics/ (staff, or "Authorization: Token <METRICS_TOKEN>")
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Redis where each worker publishes its metrics so a scrape sums them; empty reports one process
+METRICS_REDIS_URL = os.environ.get("METRICS_REDIS_URL", "")
+METRICS_PUBLISH_INTERVAL = int(os.environ.get("METRICS_PUBLISH_INTERVAL", 15))
+
+# Requests sent with "X-Profile: 1" by staff, or "X-Profile: <manage.py profile_token>", are
+# profiled and stored as RequestProfile rows (admin); the oldest beyond the limit are dropped
+PROFILING_TOKEN_MAX_AGE = int(os.environ.get("PROFILING_TOKEN_MAX_AGE", 3600))
+PROFILING_MAX_RECORDS = int(os.environ.get("PROFILING_MAX_RECORDS", 500))
+
+# Accounts resolved from JWTs are cached per process for this many seconds (saves evict them);
+# AUTH_USER_CACHE_SHARED also stores them in the default cache for other workers
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 30))
+AUTH_USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", 10000))
+AUTH_USER_CACHE_SHARED = os.environ.get("AUTH_USER_CACHE_SHARED", "False") == "True"
+
+# Serve the read-heavy endpoints from marketplace/async_views.py (on by default under noteshub/asgi.py)
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "False") == "True"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -139,7 +191,7 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'marketplace.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -55,6 +55,10 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', ''),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Keep connections between requests: the async views run queries on
+        # worker threads, which would otherwise connect for every query batch
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -90,6 +94,12 @@ CACHES = {
     }
 }
 
+# Buffered note view counts live in Redis too, so a worker crash loses none
+VIEW_COUNT_REDIS_URL = os.environ.get('VIEW_COUNT_REDIS_URL', CACHES['default']['LOCATION'])
+
+# Request metrics from every worker are summed through Redis (see marketplace/metrics.py)
+METRICS_REDIS_URL = os.environ.get('METRICS_REDIS_URL', CACHES['default']['LOCATION'])
+
 # Email configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')